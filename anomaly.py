@@ -0,0 +1,355 @@
+import argparse
+import json
+import math
+import os
+from datetime import timedelta
+from pathlib import Path
+
+import pandas as pd
+
+STATE_VERSION = 1
+
+# (output label, column in the normalized change log)
+ANOMALY_ENTITIES = [
+    ("Username", "Username"),
+    ("Housekeeper After", "Housekeeper After"),
+    ("Room Number", "Room Number"),
+]
+
+# Identify a row when deciding whether it was already ingested at the high-water second
+ROW_KEY_COLUMNS = ["DateTime", "HSK_Changed"] + [col for _, col in ANOMALY_ENTITIES] + [
+    "HSK Status Before",
+    "HSK Status After",
+    "Housekeeper Before",
+    "FD Status",
+]
+
+ANOMALY_COLUMNS = [
+    "entity",
+    "key",
+    "window_start",
+    "window_end",
+    "changes",
+    "history_windows",
+    "mean",
+    "std",
+    "ewma",
+    "zscore",
+]
+
+
+class RollingStats:
+    """Welford running mean/variance plus an EWMA; O(1) per update."""
+
+    __slots__ = ("n", "mean", "m2", "ewma", "alpha")
+
+    def __init__(self, alpha: float = 0.3):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.ewma = None
+        self.alpha = alpha
+
+    def update(self, x: float):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+        self.ewma = x if self.ewma is None else self.alpha * x + (1 - self.alpha) * self.ewma
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+
+    def to_dict(self) -> dict:
+        return {"n": self.n, "mean": self.mean, "m2": self.m2, "ewma": self.ewma}
+
+    @classmethod
+    def from_dict(cls, data: dict, alpha: float) -> "RollingStats":
+        stats = cls(alpha)
+        stats.n, stats.mean, stats.m2, stats.ewma = data["n"], data["mean"], data["m2"], data["ewma"]
+        return stats
+
+
+class _KeyState:
+    __slots__ = ("window", "count", "stats")
+
+    def __init__(self, window, alpha: float):
+        self.window = window
+        self.count = 0
+        self.stats = RollingStats(alpha)
+
+
+class ActivityAnomalyDetector:
+    """
+    Counts HSK status changes per key per time window (default: 1 hour) and scores
+    each finished window against that key's history of active windows.
+    Rows must be ingested in Date order; a window is scored once a later window starts
+    for the same key, once close_finished() passes its end, or on flush().
+    State (per-key stats, open windows, high-water mark) round-trips through
+    save_state()/load_state() so later runs only ingest newer rows. Exports are cut at
+    arbitrary points, so rows already seen at the high-water second are remembered
+    (high_water_rows: row hash -> count) and skipped when a later export repeats them.
+    """
+
+    def __init__(
+        self,
+        *,
+        window: timedelta = timedelta(hours=1),
+        z_threshold: float = 3.0,
+        min_history: int = 5,
+        min_changes: int = 3,
+        alpha: float = 0.3,
+    ):
+        self.window = pd.Timedelta(window)
+        self.z_threshold = z_threshold
+        self.min_history = min_history
+        self.min_changes = min_changes
+        self.alpha = alpha
+        self._state: dict[tuple[str, str], _KeyState] = {}
+        self.high_water: pd.Timestamp | None = None
+        self.high_water_rows: dict[str, int] = {}
+
+    def ingest(self, when: pd.Timestamp, keys: dict[str, str], changed: bool = True) -> list[dict]:
+        """Feed one change-log row; returns any anomalies for windows it closed."""
+        if pd.isna(when):
+            return []
+        if self.high_water is None or when > self.high_water:
+            self.high_water = when
+        window = when.floor(self.window)
+        flagged = []
+        for entity, key in keys.items():
+            state = self._state.get((entity, key))
+            if state is None:
+                state = self._state[(entity, key)] = _KeyState(window, self.alpha)
+            elif window != state.window:
+                anomaly = self._close(entity, key, state)
+                if anomaly:
+                    flagged.append(anomaly)
+                state.window = window
+                state.count = 0
+            if changed:
+                state.count += 1
+        return flagged
+
+    def close_finished(self, now: pd.Timestamp | None = None) -> list[dict]:
+        """Score every open window that ended at or before `now` (default: the high-water mark)."""
+        now = self.high_water if now is None else now
+        if now is None:
+            return []
+        flagged = []
+        for (entity, key), state in self._state.items():
+            if state.count and state.window + self.window <= now:
+                anomaly = self._close(entity, key, state)
+                if anomaly:
+                    flagged.append(anomaly)
+                state.count = 0
+        return flagged
+
+    def flush(self) -> list[dict]:
+        flagged = []
+        for (entity, key), state in self._state.items():
+            anomaly = self._close(entity, key, state)
+            if anomaly:
+                flagged.append(anomaly)
+            state.count = 0
+        return flagged
+
+    def _close(self, entity: str, key: str, state: _KeyState) -> dict | None:
+        if state.count == 0:
+            return None
+        stats = state.stats
+        anomaly = None
+        if stats.n >= self.min_history and state.count >= self.min_changes:
+            # Counts are small integers; a flat history shouldn't make every bump infinite
+            z = (state.count - stats.mean) / max(stats.std, 1.0)
+            if z >= self.z_threshold:
+                anomaly = {
+                    "entity": entity,
+                    "key": key,
+                    "window_start": state.window,
+                    "window_end": state.window + self.window,
+                    "changes": state.count,
+                    "history_windows": stats.n,
+                    "mean": round(stats.mean, 3),
+                    "std": round(stats.std, 3),
+                    "ewma": round(stats.ewma, 3),
+                    "zscore": round(z, 2),
+                }
+        stats.update(state.count)
+        return anomaly
+
+
+    def state_dict(self) -> dict:
+        return {
+            "version": STATE_VERSION,
+            "config": {
+                "window_seconds": self.window.total_seconds(),
+                "z_threshold": self.z_threshold,
+                "min_history": self.min_history,
+                "min_changes": self.min_changes,
+                "alpha": self.alpha,
+            },
+            "high_water": self.high_water.isoformat() if self.high_water is not None else None,
+            "high_water_rows": self.high_water_rows,
+            "keys": [
+                {
+                    "entity": entity,
+                    "key": key,
+                    "window": state.window.isoformat(),
+                    "count": state.count,
+                    **state.stats.to_dict(),
+                }
+                for (entity, key), state in self._state.items()
+            ],
+        }
+
+    def save_state(self, path: Path):
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.state_dict()), encoding="utf-8")
+        os.replace(tmp, path)
+
+    @classmethod
+    def load_state(cls, path: Path, **overrides) -> "ActivityAnomalyDetector":
+        data = json.loads(path.read_text(encoding="utf-8"))
+        config = data["config"]
+        detector = cls(
+            window=timedelta(seconds=config["window_seconds"]),
+            z_threshold=overrides.get("z_threshold", config["z_threshold"]),
+            min_history=overrides.get("min_history", config["min_history"]),
+            min_changes=overrides.get("min_changes", config["min_changes"]),
+            alpha=config["alpha"],
+        )
+        if data["high_water"]:
+            detector.high_water = pd.Timestamp(data["high_water"])
+        detector.high_water_rows = data.get("high_water_rows", {})
+        for item in data["keys"]:
+            state = _KeyState(pd.Timestamp(item["window"]), detector.alpha)
+            state.count = item["count"]
+            state.stats = RollingStats.from_dict(item, detector.alpha)
+            detector._state[(item["entity"], item["key"])] = state
+        return detector
+
+
+def _ingest_frame(detector: ActivityAnomalyDetector, df: pd.DataFrame) -> list[dict]:
+    ordered = df.sort_values("DateTime", kind="stable")
+    columns = [ordered[col].to_numpy() for _, col in ANOMALY_ENTITIES]
+    labels = [label for label, _ in ANOMALY_ENTITIES]
+
+    flagged = []
+    for when, changed, *values in zip(ordered["DateTime"], ordered["HSK_Changed"].to_numpy(), *columns):
+        flagged.extend(detector.ingest(when, dict(zip(labels, values)), bool(changed)))
+    return flagged
+
+
+def _row_hashes(df: pd.DataFrame) -> pd.Series:
+    columns = [col for col in ROW_KEY_COLUMNS if col in df.columns]
+    return pd.util.hash_pandas_object(df[columns], index=False).astype(str)
+
+
+def _unseen_rows(df: pd.DataFrame, detector: ActivityAnomalyDetector) -> pd.DataFrame:
+    """Rows after the high-water mark, plus rows at it beyond the copies already ingested."""
+    if detector.high_water is None:
+        return df
+    at_mark = df["DateTime"] == detector.high_water
+    keep = (df["DateTime"] > detector.high_water).to_numpy(copy=True)
+    if at_mark.any():
+        hashes = _row_hashes(df[at_mark])
+        # n-th copy of a row is new only if fewer than n copies were seen before
+        occurrence = hashes.groupby(hashes).cumcount() + 1
+        seen = hashes.map(detector.high_water_rows).fillna(0)
+        keep[at_mark.to_numpy()] = (occurrence > seen).to_numpy()
+    return df[keep]
+
+
+def _remember_high_water_rows(detector: ActivityAnomalyDetector, previous_mark, ingested: pd.DataFrame):
+    if detector.high_water != previous_mark:
+        detector.high_water_rows = {}
+    if detector.high_water is None:
+        return
+    counts = _row_hashes(ingested[ingested["DateTime"] == detector.high_water]).value_counts()
+    for key, n in counts.items():
+        detector.high_water_rows[key] = detector.high_water_rows.get(key, 0) + int(n)
+
+
+def _anomaly_frame(flagged: list[dict]) -> pd.DataFrame:
+    if not flagged:
+        return pd.DataFrame(columns=ANOMALY_COLUMNS)
+    return (
+        pd.DataFrame(flagged, columns=ANOMALY_COLUMNS)
+        .sort_values(["zscore", "changes"], ascending=[False, False])
+        .reset_index(drop=True)
+    )
+
+
+def detect_anomalies(df: pd.DataFrame, **detector_kwargs) -> pd.DataFrame:
+    """One streaming pass over the full change log in Date order (used by the report)."""
+    detector = ActivityAnomalyDetector(**detector_kwargs)
+    flagged = _ingest_frame(detector, df)
+    flagged.extend(detector.flush())
+    return _anomaly_frame(flagged)
+
+
+def update_anomalies(df: pd.DataFrame, state_path: Path, anomalies_path: Path, **detector_kwargs) -> pd.DataFrame:
+    """
+    Incremental mode: ingest only rows not covered by the saved state and append what
+    they flag to anomalies_path. Rows at the high-water second are matched by content,
+    so an export cut mid-second neither drops nor double-counts them. Without a state
+    file this is a one-pass run over the whole history. Windows still open at the
+    newest row stay open in the state.
+    """
+    if state_path.exists():
+        detector = ActivityAnomalyDetector.load_state(state_path, **detector_kwargs)
+        df = _unseen_rows(df, detector)
+        append = anomalies_path.exists()
+    else:
+        detector = ActivityAnomalyDetector(**detector_kwargs)
+        append = False
+
+    previous_mark = detector.high_water
+    flagged = _ingest_frame(detector, df)
+    flagged.extend(detector.close_finished())
+    _remember_high_water_rows(detector, previous_mark, df)
+    new = _anomaly_frame(flagged)
+
+    new.to_csv(anomalies_path, mode="a" if append else "w", header=not append, index=False)
+    detector.save_state(state_path)
+    return new
+
+
+def main():
+    # room.py imports this module, so its loaders are pulled in lazily
+    from change_log_store import read_partitions
+    from room import add_derived_columns, load_housekeeping
+
+    parser = argparse.ArgumentParser(description="Flag hourly activity bursts, ingesting only rows newer than the last run.")
+    parser.add_argument(
+        "--housekeeping-csv",
+        default="Housekeeping Change Log.csv",
+        help="Change log CSV to ingest (default: Housekeeping Change Log.csv)")
+    parser.add_argument("--store", default=None, help="Read from a partitioned change-log store instead of the CSV")
+    parser.add_argument("--hotel", default="default", help="Hotel partition for --store (default: default)")
+    parser.add_argument("--state", default="anomaly_state.json", help="Detector state file (default: anomaly_state.json)")
+    parser.add_argument("--out", default="anomalies.csv", help="Anomalies CSV to append to (default: anomalies.csv)")
+    parser.add_argument("--z", type=float, default=None, help="Z-score threshold (default: 3.0, or the saved state's)")
+    args = parser.parse_args()
+
+    state_path = Path(args.state)
+    overrides = {"z_threshold": args.z} if args.z is not None else {}
+    if args.store:
+        since = None
+        if state_path.exists():
+            high_water = json.loads(state_path.read_text(encoding="utf-8"))["high_water"]
+            since = pd.Timestamp(high_water).date() if high_water else None
+        # Only partitions from the high-water month onwards are opened
+        df = read_partitions(Path(args.store), args.hotel, since=since)
+    else:
+        df = load_housekeeping(Path(args.housekeeping_csv))
+    add_derived_columns(df)
+
+    new = update_anomalies(df, state_path, Path(args.out), **overrides)
+    print(f"{len(new)} new anomalies appended to {args.out}; state saved to {state_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import json
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+MANIFEST_NAME = "arrow_manifest.json"
+
+
+def require_pyarrow():
+    # pyarrow is only needed when Arrow output/storage is switched on
+    try:
+        import pyarrow as pa
+        import pyarrow.feather as feather
+    except ImportError as e:
+        raise ImportError("Arrow output/storage needs pyarrow: pip install pyarrow") from e
+    return pa, feather
+
+
+class ArrowWriter:
+    """
+    Writes report frames as Arrow IPC (Feather v2) files next to the CSVs.
+    Files are uncompressed so consumers can memory-map them and read zero-copy.
+    """
+
+    def __init__(self, out_dir: Path):
+        self.out_dir = out_dir
+        self.entries: list[dict] = []
+        self._pa, self._feather = require_pyarrow()
+
+    def write(self, df: pd.DataFrame, name: str, *, csv_name: str | None = None, kind: str = "summary") -> Path:
+        table = self._pa.Table.from_pandas(df, preserve_index=False)
+        path = self.out_dir / f"{name}.arrow"
+        self._feather.write_feather(table, path, compression="uncompressed")
+        self.entries.append({
+            "name": name,
+            "kind": kind,
+            "file": path.name,
+            "csv": csv_name,
+            "rows": table.num_rows,
+            "bytes": path.stat().st_size,
+            "schema": [{"name": f.name, "type": str(f.type)} for f in table.schema],
+        })
+        return path
+
+    def write_manifest(self) -> Path:
+        path = self.out_dir / MANIFEST_NAME
+        manifest = {
+            "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "format": "arrow-ipc-file",
+            "outputs": self.entries,
+        }
+        path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+        return path
+
+
+def read_output(path: Path):
+    """Memory-map an Arrow output written by ArrowWriter; returns a pyarrow Table."""
+    _, feather = require_pyarrow()
+    return feather.read_table(path, memory_map=True)
@@ -0,0 +1,153 @@
+import argparse
+import json
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+from telerik_export import export_headers, fetch_export, looks_like_html, save_export
+from telerik_standin import LOGGED_OUT_INSTANCE
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+REPO_DIR = Path(__file__).resolve().parent
+
+SERVING_RE = re.compile(r" at (http://\S+)")
+
+
+def start_standin(rows: int, latency_ms: float) -> tuple[subprocess.Popen, str]:
+    """
+    Run the stand-in in its own process so this process's peak RSS only covers
+    the download path, not the server or its synthetic payload.
+    """
+    proc = subprocess.Popen(
+        [sys.executable, str(REPO_DIR / "telerik_standin.py"), "--rows", str(rows),
+         "--latency-ms", str(latency_ms), "--port", "0"],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    line = proc.stdout.readline()
+    m = SERVING_RE.search(line)
+    if not m:
+        proc.kill()
+        raise RuntimeError(f"Stand-in didn't start: {line!r}")
+    return proc, m.group(1)
+
+
+def with_instance(url: str, instance_id: str) -> str:
+    return re.sub(r"instanceID=[^&]*", f"instanceID={instance_id}", url)
+
+
+def peak_rss_mb(who) -> float | None:
+    if resource is None:
+        return None
+    # ru_maxrss is KB on Linux, bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(who).ru_maxrss * scale / 1e6
+
+
+def bench_fetch(url: str, requests_total: int, concurrency: int) -> dict:
+    """Drive the Pull CSV download path (fetch + logged-out check) against the stand-in."""
+    headers = export_headers(url)
+
+    def one(_):
+        with requests.Session() as session:
+            r = fetch_export(url, headers, session=session)
+        if looks_like_html(r.content):
+            raise RuntimeError("Stand-in answered with HTML for a valid instanceID")
+        return len(r.content)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        sizes = list(pool.map(one, range(requests_total)))
+    elapsed = time.perf_counter() - started
+    total_bytes = sum(sizes)
+    return {
+        "requests": requests_total,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "requests_per_sec": round(requests_total / elapsed, 1),
+        "mb_per_sec": round(total_bytes / 1e6 / elapsed, 2),
+        "bytes_per_export": sizes[0] if sizes else 0,
+    }
+
+
+def bench_report(csv_path: Path, out_dir: Path, summaries_only: bool) -> dict:
+    cmd = [
+        sys.executable,
+        str(REPO_DIR / "room.py"),
+        "--housekeeping-csv", str(csv_path),
+        "--room-usage-csv", str(REPO_DIR / "Room Usage.csv"),
+        "--out", str(out_dir),
+    ]
+    if summaries_only:
+        cmd.append("--summaries-only")
+    started = time.perf_counter()
+    subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL)
+    return {
+        "summaries_only": summaries_only,
+        "time_to_report_s": round(time.perf_counter() - started, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fetch -> save -> normalize -> report against a local Telerik stand-in.")
+    parser.add_argument("--rows", type=int, default=50_000, help="Rows per synthetic export (default: 50000)")
+    parser.add_argument("--latency-ms", type=float, default=50, help="Stand-in response delay (default: 50)")
+    parser.add_argument("--requests", type=int, default=20, help="Export downloads to time (default: 20)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Parallel downloads (default: 4)")
+    parser.add_argument("--full-report", action="store_true", help="Time the full report (charts + HTML) instead of summaries only")
+    parser.add_argument("--json", default=None, help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    proc, url = start_standin(args.rows, args.latency_ms)
+    try:
+        fetch = bench_fetch(url, args.requests, args.concurrency)
+        fetch_rss = peak_rss_mb(resource.RUSAGE_SELF) if resource else None
+
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_dir = Path(tmp)
+            headers = export_headers(url)
+            if save_export(with_instance(url, LOGGED_OUT_INSTANCE), headers, out_dir=tmp_dir) is not None:
+                raise RuntimeError("Logged-out HTML was saved as CSV")
+
+            started = time.perf_counter()
+            csv_path = save_export(url, headers, out_dir=tmp_dir)
+            report = bench_report(csv_path, tmp_dir / "reports", summaries_only=not args.full_report)
+            report["end_to_end_s"] = round(time.perf_counter() - started, 3)
+            # Read before the stand-in is reaped, so RUSAGE_CHILDREN only covers room.py
+            report["peak_rss_mb"] = round(peak_rss_mb(resource.RUSAGE_CHILDREN), 1) if resource else None
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    results = {
+        "rows": args.rows,
+        "latency_ms": args.latency_ms,
+        "fetch": fetch,
+        "fetch_peak_rss_mb": round(fetch_rss, 1) if fetch_rss is not None else None,
+        "report": report,
+    }
+
+    print("\n=== Ingest benchmark ===")
+    print(f"Export size:        {fetch['bytes_per_export']:,} bytes ({args.rows:,} rows)")
+    print(f"Fetch:              {fetch['requests_per_sec']} req/s, {fetch['mb_per_sec']} MB/s "
+          f"({fetch['requests']} requests, concurrency {fetch['concurrency']})")
+    print(f"Time to report:     {report['time_to_report_s']}s (room.py, {'summaries only' if report['summaries_only'] else 'full'})")
+    print(f"Fetch -> report:    {report['end_to_end_s']}s")
+    print(f"Peak memory:        fetch {results['fetch_peak_rss_mb']} MB, room.py {report['peak_rss_mb']} MB")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import argparse
+import asyncio
+import datetime as dt
+import re
+import time
+from pathlib import Path
+
+from playwright.async_api import Error as PlaywrightError
+from playwright.async_api import async_playwright
+
+REPORT_PAGE_URL = "https://d301.msicloudpm.com/Reports/Reports.aspx?LSID=c12dd99d-5a06-4416-a435-3d8b56018d6c&UserId=6a302f32-0059-4c12-b4db-b76f5bc041a0"
+
+OUT_DIR = Path("exports")
+
+INSTANCE_RE = re.compile(r"instanceID=([0-9a-f]{32})", re.I)
+AXD_RE = re.compile(r"^(.*?/Telerik\.ReportViewer\.axd)", re.I)
+
+
+def parse_report(spec: str) -> tuple[str, str]:
+    # "name=url", or a bare url (named after its position)
+    name, sep, url = spec.partition("=")
+    if not sep or name.startswith("http"):
+        return "", spec
+    return name.strip(), url.strip()
+
+
+async def capture_report(context, name: str, url: str, out_dir: Path, limit: asyncio.Semaphore, wait_s: float) -> dict:
+    """Open the report page, wait for its instanceID, then download the CSV export."""
+    async with limit:
+        started = time.perf_counter()
+        page = await context.new_page()
+        found = {"iid": None, "axd": None}
+        seen = asyncio.Event()
+
+        def on_request(req):
+            m = INSTANCE_RE.search(req.url)
+            if m and found["iid"] is None:
+                found["iid"] = m.group(1)
+                axd = AXD_RE.search(req.url)
+                found["axd"] = axd.group(1) if axd else None
+                seen.set()
+
+        page.on("request", on_request)
+        try:
+            await page.goto(url, wait_until="domcontentloaded")
+            try:
+                # Returns as soon as Telerik fires its first instanceID request
+                await asyncio.wait_for(seen.wait(), timeout=wait_s)
+            except asyncio.TimeoutError:
+                raise RuntimeError(
+                    f"No instanceID seen within {wait_s:.0f}s. "
+                    "Open pw_profile once in headed mode to log in, and check the report URL."
+                ) from None
+
+            iid = found["iid"]
+            axd = found["axd"] or f"{url.split('/Reports/')[0]}/Telerik.ReportViewer.axd"
+            export_url = f"{axd}?instanceID={iid}&optype=Export&ExportFormat=CSV"
+
+            ts = dt.datetime.now().strftime("%Y-%m-%d_%H%M%S")
+            out_path = out_dir / f"{name}_{ts}.csv"
+            # Download via the browser context so cookies/auth are applied
+            async with page.expect_download() as dl_info:
+                try:
+                    await page.goto(export_url)
+                except PlaywrightError:
+                    # Chromium aborts navigations that turn into downloads
+                    pass
+            download = await dl_info.value
+            await download.save_as(out_path)
+            return {"name": name, "instance_id": iid, "path": out_path, "seconds": time.perf_counter() - started}
+        except Exception as e:
+            return {"name": name, "error": str(e), "seconds": time.perf_counter() - started}
+        finally:
+            await page.close()
+
+
+async def capture_all(reports: list[tuple[str, str]], *, concurrency: int, headless: bool, out_dir: Path, wait_s: float) -> list[dict]:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    limit = asyncio.Semaphore(max(1, concurrency))
+    async with async_playwright() as p:
+        # One browser for every report; pages share the logged-in pw_profile
+        context = await p.chromium.launch_persistent_context(
+            user_data_dir="pw_profile",
+            headless=headless,
+        )
+        try:
+            return await asyncio.gather(*(
+                capture_report(context, name, url, out_dir, limit, wait_s) for name, url in reports
+            ))
+        finally:
+            await context.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Capture instanceIDs + CSV exports for several reports from one browser.")
+    parser.add_argument(
+        "--report",
+        action="append",
+        default=[],
+        help="Report page as name=url (repeatable; default: the REPORT_PAGE_URL report)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Max pages open at once (default: 4)")
+    parser.add_argument("--wait", type=float, default=50, help="Seconds to wait for each instanceID (default: 50)")
+    parser.add_argument("--headed", action="store_true", help="Show the browser window")
+    parser.add_argument("--out", default=str(OUT_DIR), help="Download folder (default: exports)")
+    args = parser.parse_args()
+
+    reports = [parse_report(spec) for spec in args.report] or [("report", REPORT_PAGE_URL)]
+    reports = [(name or f"report{i + 1}", url) for i, (name, url) in enumerate(reports)]
+
+    started = time.perf_counter()
+    results = asyncio.run(capture_all(
+        reports,
+        concurrency=args.concurrency,
+        headless=not args.headed,
+        out_dir=Path(args.out),
+        wait_s=args.wait,
+    ))
+    wall = time.perf_counter() - started
+
+    for r in results:
+        if "error" in r:
+            print(f"[!] {r['name']}: {r['error']} ({r['seconds']:.1f}s)")
+        else:
+            print(f"[+] {r['name']}: instanceID {r['instance_id']} -> {r['path']} ({r['seconds']:.1f}s)")
+    serial = sum(r["seconds"] for r in results)
+    print(f"\nCaptured {len(results)} report(s) in {wall:.1f}s (sum of per-report times: {serial:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import re
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+from arrow_output import require_pyarrow
+
+# Rows whose Date didn't parse land here; only read when no window is requested
+UNDATED = "undated"
+
+
+def hotel_dir(store: Path, hotel: str) -> Path:
+    slug = re.sub(r"[^A-Za-z0-9_-]+", "_", hotel.strip()) or "default"
+    return store / slug
+
+
+def parse_day(value: str | None) -> date | None:
+    if not value:
+        return None
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def _month_key(month: pd.Series) -> pd.Series:
+    return month.dt.strftime("%Y-%m").fillna(UNDATED)
+
+
+def write_partitions(df: pd.DataFrame, store: Path, hotel: str) -> list[Path]:
+    """
+    Merge a normalized change log (room.py's load_housekeeping output) into one
+    Arrow file per hotel/month. Rows already stored are de-duplicated.
+    """
+    pa, feather = require_pyarrow()
+    folder = hotel_dir(store, hotel)
+    folder.mkdir(parents=True, exist_ok=True)
+
+    written = []
+    for month, part in df.groupby(_month_key(df["DateTime"]), sort=True):
+        path = folder / f"{month}.arrow"
+        if path.exists():
+            part = pd.concat([feather.read_table(path).to_pandas(), part], ignore_index=True)
+        part = part.drop_duplicates().sort_values("Date", kind="stable").reset_index(drop=True)
+        tmp = path.with_suffix(".tmp")
+        feather.write_feather(pa.Table.from_pandas(part, preserve_index=False), tmp, compression="uncompressed")
+        tmp.replace(path)
+        written.append(path)
+    return written
+
+
+def list_partitions(store: Path, hotel: str) -> dict[str, Path]:
+    return {p.stem: p for p in sorted(hotel_dir(store, hotel).glob("*.arrow"))}
+
+
+def partitions_for_window(store: Path, hotel: str, since: date | None = None, until: date | None = None) -> list[Path]:
+    """Only the month files that can overlap [since, until]; the rest are never opened."""
+    partitions = list_partitions(store, hotel)
+    if since is None and until is None:
+        return list(partitions.values())
+    first = f"{since:%Y-%m}" if since else "0000-00"
+    last = f"{until:%Y-%m}" if until else "9999-99"
+    return [path for month, path in partitions.items() if month != UNDATED and first <= month <= last]
+
+
+def filter_window(df: pd.DataFrame, since: date | None = None, until: date | None = None) -> pd.DataFrame:
+    mask = pd.Series(True, index=df.index)
+    if since:
+        mask &= df["DateTime"] >= pd.Timestamp(since)
+    if until:
+        mask &= df["DateTime"] < pd.Timestamp(until + timedelta(days=1))
+    return df[mask].reset_index(drop=True)
+
+
+def read_partitions(store: Path, hotel: str, since: date | None = None, until: date | None = None) -> pd.DataFrame:
+    pa, feather = require_pyarrow()
+    paths = partitions_for_window(store, hotel, since, until)
+    if not paths:
+        stored = list(list_partitions(store, hotel).values())
+        if not stored:
+            raise FileNotFoundError(f"No change-log partitions for {hotel} in {store}")
+        # Nothing in the window: same empty result as filtering the CSV, with the stored columns
+        with pa.ipc.open_file(stored[0]) as reader:
+            return reader.schema.empty_table().to_pandas()
+    df = pd.concat([feather.read_table(p, memory_map=True).to_pandas() for p in paths], ignore_index=True)
+    return filter_window(df, since, until)
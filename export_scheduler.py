@@ -0,0 +1,174 @@
+import argparse
+import datetime as dt
+import hashlib
+import json
+import os
+import shlex
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from telerik_export import export_headers, fetch_export, looks_like_html
+
+DEFAULT_STATE_FILE = "exports/.export_state.json"
+
+# Seconds an on_change command may run before it's killed and recorded as failed
+DEFAULT_ON_CHANGE_TIMEOUT = 900
+
+
+def load_config(path: Path) -> dict:
+    config = json.loads(path.read_text(encoding="utf-8"))
+    jobs = config.get("jobs") or []
+    if not jobs:
+        raise ValueError(f"No jobs defined in {path}")
+    names = [job.get("name") for job in jobs]
+    if None in names or len(set(names)) != len(names):
+        raise ValueError(f"Every job in {path} needs a unique name")
+    for job in jobs:
+        if not job.get("url"):
+            raise ValueError(f"Job {job['name']} has no url")
+    return config
+
+
+class ExportState:
+    """Last payload hash + timestamps per job, persisted as a small JSON file."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.jobs = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+
+    def get(self, name: str) -> dict:
+        with self._lock:
+            return dict(self.jobs.get(name, {}))
+
+    def record(self, name: str, **fields):
+        with self._lock:
+            self.jobs.setdefault(name, {}).update(fields)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self.jobs, indent=2), encoding="utf-8")
+            os.replace(tmp, self.path)
+
+
+def run_job(job: dict, state: ExportState, default_cookie: str = "") -> str:
+    """
+    Fetch one export; only store it (and run on_change) when its content hash changed.
+    An unchanged payload whose on_change never succeeded gets on_change retried.
+    """
+    name = job["name"]
+    now = dt.datetime.now().isoformat(timespec="seconds")
+    headers = export_headers(job["url"], job.get("cookie", default_cookie))
+    try:
+        r = fetch_export(job["url"], headers, timeout=job.get("timeout", 60))
+        r.raise_for_status()
+    except Exception as e:
+        state.record(name, last_checked=now, last_error=str(e))
+        return f"[!] {name}: {e}"
+
+    payload = r.content
+    if looks_like_html(payload):
+        state.record(name, last_checked=now, last_error="Got HTML instead of CSV (logged out or instanceID invalid)")
+        return f"[!] {name}: got HTML instead of CSV. Likely logged out or instanceID invalid."
+
+    digest = hashlib.sha256(payload).hexdigest()
+    last = state.get(name)
+    on_change = job.get("on_change")
+    if digest == last.get("sha256") and Path(last.get("path", "")).exists():
+        if not on_change or last.get("processed_sha256") == digest:
+            state.record(name, last_checked=now, last_error=None)
+            return f"[=] {name}: unchanged ({len(payload):,} bytes), skipped"
+        # Same data, but on_change failed last time: retry it on the stored file
+        out_path = Path(last["path"])
+        state.record(name, last_checked=now)
+        message = f"[~] {name}: unchanged, retrying on_change for {out_path}"
+    else:
+        out_dir = Path(job.get("out_dir", "exports"))
+        out_dir.mkdir(parents=True, exist_ok=True)
+        ts = dt.datetime.now().strftime("%Y%m%d_%H%M%S")
+        out_path = out_dir / f"{name}_{ts}.csv"
+        out_path.write_bytes(payload)
+        state.record(
+            name,
+            sha256=digest,
+            path=str(out_path),
+            bytes=len(payload),
+            last_checked=now,
+            last_changed=now,
+            last_error=None,
+        )
+        message = f"[+] {name}: new content saved to {out_path} ({len(payload):,} bytes)"
+
+    if on_change:
+        # Downstream processing only ever sees new data; it's marked processed only on success
+        cmd = shlex.split(on_change) if isinstance(on_change, str) else list(on_change)
+        cmd = [part.replace("{path}", str(out_path)) for part in cmd]
+        timeout = job.get("on_change_timeout", DEFAULT_ON_CHANGE_TIMEOUT)
+        try:
+            result = subprocess.run(cmd, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            error = f"on_change timed out after {timeout}s"
+        except OSError as e:
+            error = f"on_change failed to start: {e}"
+        else:
+            error = None if result.returncode == 0 else f"on_change exited {result.returncode}"
+        if error is None:
+            state.record(name, processed_sha256=digest, last_error=None)
+            message += "; on_change exited 0"
+        else:
+            state.record(name, last_error=error)
+            message += f"; {error}"
+    return message
+
+
+def run_scheduler(config: dict, *, once: bool = False):
+    jobs = config["jobs"]
+    state = ExportState(Path(config.get("state_file", DEFAULT_STATE_FILE)))
+    cookie = config.get("cookie", "")
+    limit = max(1, int(config.get("max_concurrency", 2)))
+
+    next_due = {job["name"]: 0.0 for job in jobs}
+    running = {}
+    started = set()
+    with ThreadPoolExecutor(max_workers=limit) as pool:
+        try:
+            while True:
+                now = time.monotonic()
+                for job in jobs:
+                    name = job["name"]
+                    if once and name in started:
+                        continue
+                    if name not in running and now >= next_due[name]:
+                        started.add(name)
+                        running[name] = pool.submit(run_job, job, state, cookie)
+                        next_due[name] = now + float(job.get("interval_minutes", 15)) * 60
+
+                for name, future in list(running.items()):
+                    if future.done():
+                        del running[name]
+                        try:
+                            print(future.result())
+                        except Exception as e:
+                            print(f"[!] {name}: {e}")
+
+                if once and not running and len(started) == len(jobs):
+                    return
+                wait = 0.5 if running else max(0.5, min(next_due.values()) - time.monotonic())
+                time.sleep(min(wait, 30))
+        except KeyboardInterrupt:
+            print("Stopping; waiting for running exports to finish.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pull Telerik CSV exports on a schedule, skipping unchanged payloads.")
+    parser.add_argument("config", help="Path to the jobs config (JSON)")
+    parser.add_argument("--once", action="store_true", help="Run every job once and exit")
+    args = parser.parse_args()
+
+    run_scheduler(load_config(Path(args.config)), once=args.once)
+
+
+if __name__ == "__main__":
+    main()
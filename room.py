@@ -1,12 +1,38 @@
 import argparse
 import html as htmllib
 import shutil
+import time
 from datetime import datetime
 from pathlib import Path
 
-import matplotlib.pyplot as plt
+# Measured before the heavy imports so the reported start-up cost includes them
+_START = time.perf_counter()
+
 import pandas as pd
 
+from anomaly import detect_anomalies, update_anomalies
+from arrow_output import ArrowWriter
+from change_log_store import filter_window, hotel_dir, parse_day, read_partitions, write_partitions
+from room_catalog import (
+    build_room_catalog,
+    changes_per_night_by_feature,
+    nights_by_feature as catalog_nights_by_feature,
+    normalize_room_type,
+    room_activity,
+)
+from snapshots import (
+    build_snapshot,
+    compare_snapshots,
+    load_snapshot,
+    period_bounds,
+    period_label,
+    previous_period,
+    save_snapshot,
+    stored_rows,
+    write_comparison,
+)
+from user_room_matrix import build_user_room_matrix
+
 def safe_title(s: str) -> str:
     # Keep chart titles readable and safe
     return str(s).strip().replace("\n", " ")
@@ -38,11 +64,22 @@ def ensure_output_dir(base: Path) -> Path:
     return out
 
 
-def save_df(df: pd.DataFrame, path: Path):
+def save_df(df: pd.DataFrame, path: Path, arrow: ArrowWriter | None = None):
     df.to_csv(path, index=False)
+    if arrow is not None:
+        arrow.write(df, path.stem, csv_name=path.name)
+
+
+def load_pyplot():
+    # matplotlib (backend + font cache) is only paid for by runs that draw charts
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
 
 
 def plot_and_save(fig, out_path: Path):
+    plt = load_pyplot()
     fig.tight_layout()
     fig.savefig(out_path, dpi=200)
     plt.close(fig)
@@ -88,17 +125,55 @@ def kpi_cards(kpis: list[dict] | None) -> str:
     for kpi in kpis:
         label = htmllib.escape(str(kpi.get("label", "")))
         value = htmllib.escape(str(kpi.get("value", "")))
+        delta = kpi.get("delta")
+        delta_html = f'<div class="kpi-label">{htmllib.escape(str(delta))}</div>' if delta else ""
         cards.append(
             f"""
             <div class="card span-3">
               <div class="caption">{label}</div>
               <div class="kpi">{value}</div>
+              {delta_html}
             </div>
             """
         )
     return f'<div class="grid">{"".join(cards)}</div>'
 
 
+def delta_kpis(comparison: dict) -> list[dict]:
+    baseline = comparison["baseline_period"]
+    kpis = []
+    for row in comparison["kpis"]:
+        if row["is_rate"]:
+            value = f"{row['current']:.1%}"
+            delta = f"{row['delta'] * 100:+.1f} pts vs {baseline}"
+        else:
+            value = f"{row['current']:,}"
+            delta = f"{row['delta']:+,.0f} vs {baseline}"
+        kpis.append({"label": row["metric"], "value": value, "delta": delta})
+    return kpis
+
+
+def comparison_section(comparison: dict | None) -> str:
+    if not comparison:
+        return ""
+    period = htmllib.escape(comparison["period"])
+    baseline = htmllib.escape(comparison["baseline_period"])
+    return f"""
+      <h3>Period comparison ({period} vs {baseline})</h3>
+      {kpi_cards(delta_kpis(comparison))}
+      <div class="grid">
+        <div class="card span-12 zoomable">
+          <div class="caption">By housekeeper (After), with deltas</div>
+          {df_to_html_table(comparison.get("by_hk_after"))}
+        </div>
+        <div class="card span-12 zoomable">
+          <div class="caption">Rotation by username, with deltas</div>
+          {df_to_html_table(comparison.get("by_user"))}
+        </div>
+      </div>
+    """
+
+
 def exec_notes(notes: list[str]) -> str:
     if not notes:
         return '<div class="muted">No notes available.</div>'
@@ -115,6 +190,7 @@ def render_html_report(
     out_dir: Path,
     housekeeping: dict,
     room_usage: dict,
+    comparison: dict | None = None,
 ):
     template_text = template_path.read_text(encoding="utf-8")
     context = {
@@ -124,15 +200,262 @@ def render_html_report(
         "out_dir": out_dir,
         "housekeeping": housekeeping,
         "room_usage": room_usage,
+        "comparison": comparison,
         "df_to_html_table": df_to_html_table,
         "charts_grid": charts_grid,
         "kpi_cards": kpi_cards,
         "exec_notes": exec_notes,
+        "comparison_section": comparison_section,
     }
     html_content = eval(f"f'''{template_text}'''", {"__builtins__": {}}, context)
     output_path.write_text(html_content, encoding="utf-8")
 
 
+def housekeeping_charts(
+    df: pd.DataFrame,
+    by_day: pd.DataFrame | None,
+    by_hk_after: pd.DataFrame,
+    transition: pd.DataFrame,
+    out_dir: Path,
+    top_n: int,
+) -> list[dict]:
+    plt = load_pyplot()
+    charts = []
+
+    # 1) Daily volume
+    if by_day is not None and len(by_day) > 0:
+        fig = plt.figure()
+        plt.plot(by_day["Day"], by_day["rows"], marker="o")
+        plt.title("Daily volume (rows logged)")
+        plt.xlabel("Day")
+        plt.ylabel("Rows")
+        plt.xticks(rotation=45, ha="right")
+        daily_volume_path = out_dir / "daily_volume.png"
+        plot_and_save(fig, daily_volume_path)
+        charts.append({
+            "title": "Daily volume (rows logged)",
+            "filename": daily_volume_path.name,
+        })
+
+        # 2) Daily changes
+        fig = plt.figure()
+        plt.plot(by_day["Day"], by_day["changed"], marker="o")
+        plt.title("Daily HSK status changes (Before ≠ After)")
+        plt.xlabel("Day")
+        plt.ylabel("Changed rows")
+        plt.xticks(rotation=45, ha="right")
+        daily_changes_path = out_dir / "daily_changes.png"
+        plot_and_save(fig, daily_changes_path)
+        charts.append({
+            "title": "Daily HSK status changes (Before ≠ After)",
+            "filename": daily_changes_path.name,
+        })
+
+        # 3) HSK After distribution by day (stacked bar)
+        # Keep top statuses for readability
+        top_statuses = (
+            df["HSK Status After"].value_counts()
+              .head(8)
+              .index
+        )
+        df_status = df[df["HSK Status After"].isin(top_statuses)].copy()
+        status_by_day = (
+            df_status.groupby(["Day", "HSK Status After"])
+                     .size()
+                     .unstack(fill_value=0)
+                     .sort_index()
+        )
+        fig = plt.figure()
+        status_by_day.plot(kind="bar", stacked=True, ax=plt.gca())
+        plt.title("HSK Status After by day (top statuses)")
+        plt.xlabel("Day")
+        plt.ylabel("Count")
+        plt.xticks(rotation=45, ha="right", fontsize=6)
+        plt.legend(title="HSK After", bbox_to_anchor=(1.02, 1), loc="upper left")
+        hsk_after_by_day_path = out_dir / "hsk_after_by_day.png"
+        plot_and_save(fig, hsk_after_by_day_path)
+        charts.append({
+            "title": "HSK Status After by day (top statuses)",
+            "filename": hsk_after_by_day_path.name,
+        })
+
+    # 4) Top housekeepers (After)
+    hk_top = by_hk_after.head(top_n)
+    fig = plt.figure()
+    plt.barh(hk_top["Housekeeper After"].map(safe_title), hk_top["changed"])
+    plt.title(f"Top {top_n} Housekeepers (by HSK changes, After)")
+    plt.xlabel("Changed rows")
+    plt.ylabel("Housekeeper After")
+    plt.gca().invert_yaxis()
+    top_housekeepers_path = out_dir / "top_housekeepers_after.png"
+    plot_and_save(fig, top_housekeepers_path)
+    charts.append({
+        "title": f"Top {top_n} Housekeepers (by HSK changes, After)",
+        "filename": top_housekeepers_path.name,
+    })
+
+    # 5) Transition heatmap (Before -> After) using imshow (no seaborn)
+    fig = plt.figure()
+    mat = transition.values
+    plt.imshow(mat, aspect="auto")
+    plt.title("HSK Status Transition Matrix (Before → After)")
+    plt.xlabel("HSK Status After")
+    plt.ylabel("HSK Status Before")
+    plt.xticks(range(len(transition.columns)), [safe_title(c) for c in transition.columns], rotation=45, ha="right")
+    plt.yticks(range(len(transition.index)), [safe_title(i) for i in transition.index])
+
+    # Annotate cells lightly (skip if huge)
+    if mat.size <= 400:  # 20x20 cap for sanity
+        for i in range(mat.shape[0]):
+            for j in range(mat.shape[1]):
+                val = mat[i, j]
+                if val != 0:
+                    plt.text(j, i, str(val), ha="center", va="center")
+
+    hsk_transition_heatmap_path = out_dir / "hsk_transition_heatmap.png"
+    plot_and_save(fig, hsk_transition_heatmap_path)
+    charts.append({
+        "title": "HSK Status Transition Matrix (Before → After)",
+        "filename": hsk_transition_heatmap_path.name,
+    })
+
+    return charts
+
+
+def room_usage_charts(
+    nights_by_room_type: pd.DataFrame,
+    top_rooms: pd.DataFrame,
+    nights_by_feature: pd.DataFrame,
+    out_dir: Path,
+    top_n: int,
+) -> list[dict]:
+    plt = load_pyplot()
+    usage_charts = []
+    if not nights_by_room_type.empty:
+        fig = plt.figure()
+        plt.barh(nights_by_room_type["Room Type"].map(safe_title), nights_by_room_type["total_nights"])
+        plt.title("Total nights by room type")
+        plt.xlabel("Total nights")
+        plt.ylabel("Room type")
+        plt.gca().invert_yaxis()
+        room_type_nights_path = out_dir / "room_usage_room_type_nights.png"
+        plot_and_save(fig, room_type_nights_path)
+        usage_charts.append({
+            "title": "",
+            "filename": room_type_nights_path.name,
+        })
+
+    if not top_rooms.empty:
+        fig = plt.figure()
+        top_rooms_plot = top_rooms.head(top_n)
+        labels = top_rooms_plot.apply(
+            lambda row: f"{row['Room Number']} ({row['Room Type']})", axis=1
+        )
+        plt.barh(labels.map(safe_title), top_rooms_plot["Number of Nights"])
+        plt.title(f"Top {top_n} rooms by nights")
+        plt.xlabel("Number of nights")
+        plt.ylabel("Room")
+        plt.yticks(fontsize=6)
+        plt.gca().invert_yaxis()
+        top_rooms_path = out_dir / "room_usage_top_rooms.png"
+        plot_and_save(fig, top_rooms_path)
+        usage_charts.append({
+            "title": "",
+            "filename": top_rooms_path.name,
+        })
+
+    if not nights_by_feature.empty:
+        fig = plt.figure()
+        feature_plot = nights_by_feature.head(top_n)
+        plt.barh(feature_plot["Feature"].map(safe_title), feature_plot["total_nights"])
+        plt.title(f"Top {top_n} features by nights")
+        plt.xlabel("Total nights")
+        plt.ylabel("Feature")
+        plt.gca().invert_yaxis()
+        feature_nights_path = out_dir / "room_usage_feature_nights.png"
+        plot_and_save(fig, feature_nights_path)
+        usage_charts.append({
+            "title": "",
+            "filename": feature_nights_path.name,
+        })
+
+    return usage_charts
+
+
+HOUSEKEEPING_REQUIRED_COLS = [
+    "Room Number",
+    "Room Type",
+    "FD Status",
+    "HSK Status Before",
+    "HSK Status After",
+    "Housekeeper Before",
+    "Housekeeper After",
+    "Username",
+    "Date",
+]
+
+
+def load_housekeeping(path: Path) -> pd.DataFrame:
+    """Read + normalize the change log; this is what the partitioned store keeps."""
+    df = pd.read_csv(path)
+
+    missing = [c for c in HOUSEKEEPING_REQUIRED_COLS if c not in df.columns]
+    if missing:
+        raise ValueError(f"Missing required columns in CSV: {missing}")
+
+    # Normalize types
+    df["Room Number"] = df["Room Number"].astype(str).str.strip()
+    df["Room Type"] = normalize_room_type(df["Room Type"])
+    df["FD Status"] = df["FD Status"].astype(str).str.strip()
+    df["HSK Status Before"] = df["HSK Status Before"].astype(str).str.strip()
+    df["HSK Status After"] = df["HSK Status After"].astype(str).str.strip()
+    df["Housekeeper Before"] = df["Housekeeper Before"].fillna("Unknown").astype(str).str.strip()
+    df["Housekeeper After"] = df["Housekeeper After"].fillna("Unknown").astype(str).str.strip()
+    df["Username"] = df["Username"].fillna("Unknown").astype(str).str.strip()
+
+    df["DateTime"] = coerce_datetime(df["Date"])
+    return df
+
+
+def add_derived_columns(df: pd.DataFrame):
+    # If Date parsing fails, we'll still report but day-based charts may be limited.
+    df["Day"] = df["DateTime"].dt.date
+
+    # Work happened flag
+    df["HSK_Changed"] = df["HSK Status Before"] != df["HSK Status After"]
+
+    # Transition label
+    df["HSK_Transition"] = df["HSK Status Before"].fillna("") + " → " + df["HSK Status After"].fillna("")
+
+
+def snapshot_aggregates(df: pd.DataFrame) -> tuple[dict, pd.DataFrame, pd.DataFrame]:
+    """KPIs, per-housekeeper output and per-user rotation for one snapshot period."""
+    total_rows = len(df)
+    changed = int(df["HSK_Changed"].sum())
+    by_hk_after = (
+        df.groupby("Housekeeper After", dropna=False)
+          .agg(rows=("Room Number", "size"), changed=("HSK_Changed", "sum"))
+          .reset_index()
+    )
+    by_hk_after["change_rate"] = (by_hk_after["changed"] / by_hk_after["rows"]).round(4)
+
+    rotation = build_user_room_matrix(df).rotation_metrics()
+    status_changes = df.groupby("Username")["HSK_Changed"].sum().rename("status_changes")
+    rotation = rotation.merge(status_changes, left_on="Username", right_index=True, how="left")
+    rotation["room_uniqueness_rate"] = rotation["room_uniqueness_rate"].round(3)
+    rotation["room_randomness"] = rotation["room_randomness"].round(3)
+
+    kpis = {
+        "total_rows": total_rows,
+        "unique_rooms": int(df["Room Number"].nunique()),
+        "changed": changed,
+        "change_rate": round(changed / total_rows, 4) if total_rows else 0.0,
+        "avg_room_uniqueness_rate": round(float(rotation["room_uniqueness_rate"].mean()), 4) if len(rotation) else 0.0,
+        "avg_room_randomness": round(float(rotation["room_randomness"].mean()), 4) if len(rotation) else 0.0,
+    }
+    return kpis, by_hk_after, rotation
+
+
 def main():
     parser = argparse.ArgumentParser(description="Generate housekeeping management visuals + summaries from CSV.")
     parser.add_argument(
@@ -155,57 +478,124 @@ def main():
         type=int,
         default=25,
         help="Top N for housekeepers/user charts (default: 10)")
-    
+
+    parser.add_argument(
+        "--arrow",
+        action="store_true",
+        help="Also write each summary as an Arrow IPC (.arrow) file plus arrow_manifest.json")
+
+    parser.add_argument(
+        "--arrow-base",
+        action="store_true",
+        help="With --arrow, also write the normalized housekeeping/room usage frames")
+
+    parser.add_argument(
+        "--period",
+        default="week",
+        help="Snapshot for this run: week or month (only the rows in the ISO week/month of the latest "
+             "logged day; default: week), or an explicit label covering the whole loaded window")
+
+    parser.add_argument(
+        "--compare-to",
+        default=None,
+        help="Compare against a stored snapshot: 'previous' or a period label (e.g. 2026-W02)")
+
+    parser.add_argument(
+        "--snapshot-dir",
+        default=None,
+        help="Snapshot store for --period/--compare-to (default: <out>/snapshots)")
+
+    parser.add_argument(
+        "--since",
+        type=parse_day,
+        default=None,
+        help="Only report changes on/after this day (YYYY-MM-DD)")
+
+    parser.add_argument(
+        "--until",
+        type=parse_day,
+        default=None,
+        help="Only report changes on/before this day (YYYY-MM-DD)")
+
+    parser.add_argument(
+        "--store",
+        default=None,
+        help="Partitioned change-log store (one Arrow file per hotel/month); read instead of the CSV")
+
+    parser.add_argument(
+        "--ingest",
+        action="store_true",
+        help="With --store, merge --housekeeping-csv into the store before reporting")
+
+    parser.add_argument(
+        "--hotel",
+        default="default",
+        help="Hotel partition to ingest into / read from (default: default)")
+
+    parser.add_argument(
+        "--anomaly-z",
+        type=float,
+        default=3.0,
+        help="Z-score above which an hourly user/housekeeper/room change count is flagged (default: 3.0)")
+
+    parser.add_argument(
+        "--summaries-only", "--no-charts",
+        dest="summaries_only",
+        action="store_true",
+        help="Only write the CSV summaries: skip charts and the HTML report (matplotlib is never imported)")
+
     args = parser.parse_args()
 
     housekeeping_csv_path = Path(args.housekeeping_csv)
     room_usage_csv_path = Path(args.room_usage_csv)
     out_base = Path(args.out)
 
-    if not housekeeping_csv_path.exists():
-        raise FileNotFoundError(f"CSV not found: {housekeeping_csv_path}")
+    if args.ingest and not args.store:
+        parser.error("--ingest needs --store")
+    if args.arrow_base and not args.arrow:
+        parser.error("--arrow-base needs --arrow")
+    if args.compare_to == "previous" and args.period not in ("week", "month"):
+        try:
+            previous_period(args.period)
+        except ValueError as e:
+            parser.error(f"--compare-to previous: {e}")
+    if args.since and args.until and args.since > args.until:
+        parser.error("--since is later than --until")
     if not room_usage_csv_path.exists():
         raise FileNotFoundError(f"CSV not found: {room_usage_csv_path}")
 
     out_dir = ensure_output_dir(out_base)
+    arrow = ArrowWriter(out_dir) if args.arrow else None
 
     # ---- Load housekeeping ----
-    df = pd.read_csv(housekeeping_csv_path)
-
-    required_cols = [
-        "Room Number",
-        "Room Type",
-        "FD Status",
-        "HSK Status Before",
-        "HSK Status After",
-        "Housekeeper Before",
-        "Housekeeper After",
-        "Username",
-        "Date",
-    ]
-    missing = [c for c in required_cols if c not in df.columns]
-    if missing:
-        raise ValueError(f"Missing required columns in CSV: {missing}")
-
-    # Normalize types
-    df["Room Number"] = df["Room Number"].astype(str).str.strip()
-    df["Room Type"] = df["Room Type"].astype(str).str.strip()
-    df["FD Status"] = df["FD Status"].astype(str).str.strip()
-    df["HSK Status Before"] = df["HSK Status Before"].astype(str).str.strip()
-    df["HSK Status After"] = df["HSK Status After"].astype(str).str.strip()
-    df["Housekeeper Before"] = df["Housekeeper Before"].fillna("Unknown").astype(str).str.strip()
-    df["Housekeeper After"] = df["Housekeeper After"].fillna("Unknown").astype(str).str.strip()
-    df["Username"] = df["Username"].fillna("Unknown").astype(str).str.strip()
-
-    df["DateTime"] = coerce_datetime(df["Date"])
-    # If Date parsing fails, we'll still report but day-based charts may be limited.
-    df["Day"] = df["DateTime"].dt.date
-
-    # Work happened flag
-    df["HSK_Changed"] = df["HSK Status Before"] != df["HSK Status After"]
+    since, until = args.since, args.until
+    if args.store:
+        store = Path(args.store)
+        if args.ingest:
+            if not housekeeping_csv_path.exists():
+                raise FileNotFoundError(f"CSV not found: {housekeeping_csv_path}")
+            ingested = load_housekeeping(housekeeping_csv_path)
+            written = write_partitions(ingested, store, args.hotel)
+            print(f"Ingested {housekeeping_csv_path} into {len(written)} partition(s) under {hotel_dir(store, args.hotel)}")
+            # Feed the same rows to the incremental anomaly detector (only rows past its high-water mark)
+            state_path = hotel_dir(store, args.hotel) / "anomaly_state.json"
+            add_derived_columns(ingested)
+            new_anomalies = update_anomalies(
+                ingested, state_path, state_path.with_name("anomalies.csv"), z_threshold=args.anomaly_z
+            )
+            print(f"{len(new_anomalies)} new anomalies appended to {state_path.with_name('anomalies.csv')}")
+        # Only month files overlapping --since/--until are opened
+        df = read_partitions(store, args.hotel, since, until)
+        source = f"{hotel_dir(store, args.hotel).resolve()} (partitioned)"
+    else:
+        if not housekeeping_csv_path.exists():
+            raise FileNotFoundError(f"CSV not found: {housekeeping_csv_path}")
+        df = filter_window(load_housekeeping(housekeeping_csv_path), since, until)
+        source = str(housekeeping_csv_path.resolve())
+    add_derived_columns(df)
 
-    # Transition label
-    df["HSK_Transition"] = df["HSK Status Before"].fillna("") + " → " + df["HSK Status After"].fillna("")
+    if arrow is not None and args.arrow_base:
+        arrow.write(df, "base_housekeeping", kind="base")
 
     # ---- Summaries ----
     total_rows = len(df)
@@ -221,9 +611,10 @@ def main():
         "HSK status changes (rate)": round(change_rate, 4),
         "Date parse success rate": round(df["DateTime"].notna().mean(), 4),
         "Generated at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "Source CSV": str(housekeeping_csv_path.resolve()),
+        "Source CSV": source,
     }])
-    save_df(overall, out_dir / "summary_overall.csv")
+    save_df(overall, out_dir / "summary_overall.csv", arrow)
+    first_output_s = time.perf_counter() - _START
 
     # By day (if dates parse)
     if df["Day"].notna().any():
@@ -237,7 +628,7 @@ def main():
               .reset_index()
         )
         by_day["change_rate"] = (by_day["changed"] / by_day["rows"]).round(4)
-        save_df(by_day, out_dir / "summary_by_day.csv")
+        save_df(by_day, out_dir / "summary_by_day.csv", arrow)
     else:
         by_day = None
 
@@ -253,7 +644,7 @@ def main():
           .sort_values(["changed", "rows"], ascending=[False, False])
     )
     by_room_type["change_rate"] = (by_room_type["changed"] / by_room_type["rows"]).round(4)
-    save_df(by_room_type, out_dir / "summary_by_room_type.csv")
+    save_df(by_room_type, out_dir / "summary_by_room_type.csv", arrow)
 
     # By Housekeeper After (who closed/ended state)
     by_hk_after = (
@@ -267,7 +658,7 @@ def main():
           .sort_values(["changed", "rows"], ascending=[False, False])
     )
     by_hk_after["change_rate"] = (by_hk_after["changed"] / by_hk_after["rows"]).round(4)
-    save_df(by_hk_after, out_dir / "summary_by_housekeeper_after.csv")
+    save_df(by_hk_after, out_dir / "summary_by_housekeeper_after.csv", arrow)
 
     # By Username
     by_user = (
@@ -282,48 +673,28 @@ def main():
     )
     by_user["change_rate"] = (by_user["changed"] / by_user["rows"]).round(4)
 
-    room_distribution = (
-        df.groupby(["Username", "Room Number"], dropna=False)
-          .size()
-          .reset_index(name="room_actions")
-    )
-    room_totals = (
-        room_distribution.groupby("Username", dropna=False)["room_actions"]
-        .sum()
-        .reset_index(name="total_actions")
-    )
-    room_distribution = room_distribution.merge(room_totals, on="Username", how="left")
-    room_distribution["room_share"] = (
-        room_distribution["room_actions"] / room_distribution["total_actions"].replace(0, pd.NA)
-    )
-    room_randomness = (
-        room_distribution.assign(room_share_sq=room_distribution["room_share"] ** 2)
-        .groupby("Username", dropna=False)["room_share_sq"]
-        .sum()
-        .reset_index(name="room_hhi")
-    )
-    room_randomness["room_randomness"] = 1 - room_randomness["room_hhi"]
-    room_randomness = room_randomness.drop(columns=["room_hhi"])
+    # Sparse user x room action counts; every rotation metric is a row operation on it
+    user_rooms = build_user_room_matrix(df)
+    rotation = user_rooms.rotation_metrics()
+    room_randomness = rotation[["Username", "room_randomness"]]
 
     by_user = by_user.merge(room_randomness, on="Username", how="left")
     by_user["room_randomness"] = by_user["room_randomness"].fillna(0.0).round(3)
-    save_df(by_user, out_dir / "summary_by_username.csv")
+    save_df(by_user, out_dir / "summary_by_username.csv", arrow)
 
     # Room uniqueness by user (rotation quality)
-    uniqueness_by_user = (
-        df.groupby("Username", dropna=False)
-          .agg(
-              total_actions=("Room Number", "size"),
-              unique_rooms=("Room Number", "nunique"),
-              status_changes=("HSK_Changed", "sum"),
-          )
-          .reset_index()
-    )
-    uniqueness_by_user = uniqueness_by_user.merge(room_randomness, on="Username", how="left")
-    uniqueness_by_user["room_uniqueness_rate"] = (
-        uniqueness_by_user["unique_rooms"] / uniqueness_by_user["total_actions"].replace(0, pd.NA)
-    ).fillna(0.0)
-    uniqueness_by_user["room_randomness"] = uniqueness_by_user["room_randomness"].fillna(0.0)
+    uniqueness_by_user = rotation.merge(
+        by_user[["Username", "changed"]].rename(columns={"changed": "status_changes"}),
+        on="Username",
+        how="left",
+    ).reindex(columns=[
+        "Username",
+        "total_actions",
+        "unique_rooms",
+        "status_changes",
+        "room_randomness",
+        "room_uniqueness_rate",
+    ])
     uniqueness_by_user["room_randomness_rank"] = (
         uniqueness_by_user["room_randomness"].rank(method="dense", ascending=False).astype(int)
     )
@@ -334,7 +705,63 @@ def main():
     )
     uniqueness_by_user["room_uniqueness_rate"] = uniqueness_by_user["room_uniqueness_rate"].round(3)
     uniqueness_by_user["room_randomness"] = uniqueness_by_user["room_randomness"].round(3)
-    save_df(uniqueness_by_user, out_dir / "username_room_rotation_uniqueness.csv")
+    save_df(uniqueness_by_user, out_dir / "username_room_rotation_uniqueness.csv", arrow)
+
+    user_similarity = user_rooms.user_similarity()
+    save_df(user_similarity, out_dir / "username_room_similarity.csv", arrow)
+    room_concentration = user_rooms.room_concentration()
+    save_df(room_concentration, out_dir / "room_user_concentration.csv", arrow)
+
+    # ---- Snapshot + period comparison ----
+    # Each run stores its aggregates; comparisons only ever read two snapshots.
+    snapshot_dir = Path(args.snapshot_dir) if args.snapshot_dir else out_base / "snapshots"
+    snapshot = None
+    if not df["Day"].notna().any():
+        print("[!] No dated rows; no snapshot written.")
+    else:
+        partial = False
+        if args.period in ("week", "month"):
+            period = period_label(df["Day"].dropna().max(), args.period)
+            # The snapshot only holds rows from its own week/month, not the whole loaded log
+            start, end = period_bounds(period)
+            period_df = filter_window(df, start, end)
+            partial = (since is not None and since > start) or (until is not None and until < end)
+        else:
+            # Explicit labels describe whatever window was loaded (--since/--until)
+            period = args.period
+            period_df = df
+        snapshot_kpis, snapshot_hk, snapshot_users = snapshot_aggregates(period_df)
+        snapshot = build_snapshot(
+            period,
+            kpis=snapshot_kpis,
+            by_hk_after=snapshot_hk,
+            uniqueness_by_user=snapshot_users,
+            source=source,
+        )
+        existing_rows = stored_rows(snapshot_dir, period)
+        if partial:
+            print(f"[!] --since/--until covers only part of {period}; snapshot not saved.")
+        elif existing_rows is not None and existing_rows > snapshot_kpis["total_rows"]:
+            print(
+                f"[!] Stored {period} snapshot has more rows ({existing_rows:,} vs {snapshot_kpis['total_rows']:,}); "
+                "keeping it. Delete it to replace."
+            )
+        else:
+            save_snapshot(snapshot_dir, snapshot)
+
+    comparison = None
+    if args.compare_to and snapshot is not None:
+        baseline_period = previous_period(period) if args.compare_to == "previous" else args.compare_to
+        try:
+            comparison = compare_snapshots(snapshot, load_snapshot(snapshot_dir, baseline_period))
+        except FileNotFoundError as e:
+            print(f"[!] {e}; skipping period comparison.")
+        else:
+            write_comparison(comparison, out_dir)
+
+    # Hourly change bursts per user / housekeeper / room, scored in one pass over Date
+    anomalies = detect_anomalies(df, z_threshold=args.anomaly_z)
+    save_df(anomalies, out_dir / "anomalies.csv", arrow)
 
     # Transition matrix (Before -> After)
     transition = (
@@ -348,108 +775,13 @@ def main():
         .sort_index()
     )
 
-    # ---- Charts ----
-    charts = []
-
-    # 1) Daily volume
-    if by_day is not None and len(by_day) > 0:
-        fig = plt.figure()
-        plt.plot(by_day["Day"], by_day["rows"], marker="o")
-        plt.title("Daily volume (rows logged)")
-        plt.xlabel("Day")
-        plt.ylabel("Rows")
-        plt.xticks(rotation=45, ha="right")
-        daily_volume_path = out_dir / "daily_volume.png"
-        plot_and_save(fig, daily_volume_path)
-        charts.append({
-            "title": "Daily volume (rows logged)",
-            "filename": daily_volume_path.name,
-        })
-
-        # 2) Daily changes
-        fig = plt.figure()
-        plt.plot(by_day["Day"], by_day["changed"], marker="o")
-        plt.title("Daily HSK status changes (Before ≠ After)")
-        plt.xlabel("Day")
-        plt.ylabel("Changed rows")
-        plt.xticks(rotation=45, ha="right")
-        daily_changes_path = out_dir / "daily_changes.png"
-        plot_and_save(fig, daily_changes_path)
-        charts.append({
-            "title": "Daily HSK status changes (Before ≠ After)",
-            "filename": daily_changes_path.name,
-        })
-
-        # 3) HSK After distribution by day (stacked bar)
-        # Keep top statuses for readability
-        top_statuses = (
-            df["HSK Status After"].value_counts()
-              .head(8)
-              .index
-        )
-        df_status = df[df["HSK Status After"].isin(top_statuses)].copy()
-        status_by_day = (
-            df_status.groupby(["Day", "HSK Status After"])
-                     .size()
-                     .unstack(fill_value=0)
-                     .sort_index()
-        )
-        fig = plt.figure()
-        status_by_day.plot(kind="bar", stacked=True, ax=plt.gca())
-        plt.title("HSK Status After by day (top statuses)")
-        plt.xlabel("Day")
-        plt.ylabel("Count")
-        plt.xticks(rotation=45, ha="right", fontsize=6)
-        plt.legend(title="HSK After", bbox_to_anchor=(1.02, 1), loc="upper left")
-        hsk_after_by_day_path = out_dir / "hsk_after_by_day.png"
-        plot_and_save(fig, hsk_after_by_day_path)
-        charts.append({
-            "title": "HSK Status After by day (top statuses)",
-            "filename": hsk_after_by_day_path.name,
-        })
+    transition.to_csv(out_dir / "summary_transition_matrix.csv")
+    if arrow is not None:
+        arrow.write(transition.reset_index(), "summary_transition_matrix", csv_name="summary_transition_matrix.csv")
 
-    # 4) Top housekeepers (After)
+    # ---- Charts ----
     top_n = max(1, int(args.top))
-    hk_top = by_hk_after.head(top_n)
-    fig = plt.figure()
-    plt.barh(hk_top["Housekeeper After"].map(safe_title), hk_top["changed"])
-    plt.title(f"Top {top_n} Housekeepers (by HSK changes, After)")
-    plt.xlabel("Changed rows")
-    plt.ylabel("Housekeeper After")
-    plt.gca().invert_yaxis()
-    top_housekeepers_path = out_dir / "top_housekeepers_after.png"
-    plot_and_save(fig, top_housekeepers_path)
-    charts.append({
-        "title": f"Top {top_n} Housekeepers (by HSK changes, After)",
-        "filename": top_housekeepers_path.name,
-    })
-
-    # 5) Transition heatmap (Before -> After) using imshow (no seaborn)
-    fig = plt.figure()
-    mat = transition.values
-    plt.imshow(mat, aspect="auto")
-    plt.title("HSK Status Transition Matrix (Before → After)")
-    plt.xlabel("HSK Status After")
-    plt.ylabel("HSK Status Before")
-    plt.xticks(range(len(transition.columns)), [safe_title(c) for c in transition.columns], rotation=45, ha="right")
-    plt.yticks(range(len(transition.index)), [safe_title(i) for i in transition.index])
-
-    # Annotate cells lightly (skip if huge)
-    if mat.size <= 400:  # 20x20 cap for sanity
-        for i in range(mat.shape[0]):
-            for j in range(mat.shape[1]):
-                val = mat[i, j]
-                if val != 0:
-                    plt.text(j, i, str(val), ha="center", va="center")
-
-    hsk_transition_heatmap_path = out_dir / "hsk_transition_heatmap.png"
-    plot_and_save(fig, hsk_transition_heatmap_path)
-    charts.append({
-        "title": "HSK Status Transition Matrix (Before → After)",
-        "filename": hsk_transition_heatmap_path.name,
-    })
-
-    transition.to_csv(out_dir / "summary_transition_matrix.csv")
+    charts = [] if args.summaries_only else housekeeping_charts(df, by_day, by_hk_after, transition, out_dir, top_n)
 
     housekeeping_kpis = [
         {"label": "Total rows", "value": total_rows},
@@ -469,6 +801,8 @@ def main():
     ]
     if top_housekeeper:
         exec_note_items.append(f"Most frequent closer: {top_housekeeper}.")
+    if not anomalies.empty:
+        exec_note_items.append(f"{len(anomalies)} unusual bursts of activity flagged (see Activity anomalies).")
 
     housekeeping_payload = {
         "kpis": housekeeping_kpis,
@@ -479,6 +813,9 @@ def main():
         "by_hk_after": by_hk_after,
         "by_user": by_user,
         "transition_matrix": transition.reset_index(),
+        "anomalies": anomalies,
+        "user_similarity": user_similarity,
+        "room_concentration": room_concentration,
     }
 
     # ---- Load room usage ----
@@ -494,10 +831,13 @@ def main():
         raise ValueError(f"Missing required columns in Room Usage CSV: {usage_missing}")
 
     usage_df["Room Number"] = usage_df["Room Number"].astype(str).str.strip()
-    usage_df["Room Type"] = usage_df["Room Type"].astype(str).str.strip()
+    usage_df["Room Type"] = normalize_room_type(usage_df["Room Type"])
     usage_df["Number of Nights"] = pd.to_numeric(usage_df["Number of Nights"], errors="coerce").fillna(0)
     usage_df["Orientation/Features"] = usage_df["Orientation/Features"].fillna("").astype(str).str.strip()
 
+    if arrow is not None and args.arrow_base:
+        arrow.write(usage_df, "base_room_usage", kind="base")
+
     total_nights = float(usage_df["Number of Nights"].sum())
     avg_nights = float(usage_df["Number of Nights"].mean()) if not usage_df.empty else 0.0
     rooms_count = int(usage_df["Room Number"].nunique())
@@ -509,7 +849,7 @@ def main():
         "Generated at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         "Source CSV": str(room_usage_csv_path.resolve()),
     }])
-    save_df(usage_overall, out_dir / "room_usage_summary_overall.csv")
+    save_df(usage_overall, out_dir / "room_usage_summary_overall.csv", arrow)
 
     nights_by_room_type = (
         usage_df.groupby("Room Type", dropna=False)
@@ -522,7 +862,7 @@ def main():
         .sort_values(["total_nights", "rooms"], ascending=[False, False])
     )
     nights_by_room_type["avg_nights"] = nights_by_room_type["avg_nights"].round(2)
-    save_df(nights_by_room_type, out_dir / "room_usage_by_room_type.csv")
+    save_df(nights_by_room_type, out_dir / "room_usage_by_room_type.csv", arrow)
 
     top_rooms = (
         usage_df.groupby(["Room Number", "Room Type"], dropna=False)["Number of Nights"]
@@ -530,78 +870,21 @@ def main():
         .reset_index()
         .sort_values("Number of Nights", ascending=False)
     )
-    save_df(top_rooms, out_dir / "room_usage_top_rooms.csv")
-
-    feature_rows = usage_df.assign(
-        Feature=usage_df["Orientation/Features"]
-        .str.split(r"\s*,\s*")
-    ).explode("Feature")
-    feature_rows["Feature"] = feature_rows["Feature"].fillna("").str.strip()
-    feature_rows = feature_rows[feature_rows["Feature"] != ""]
-    if feature_rows.empty:
-        nights_by_feature = pd.DataFrame(columns=["Feature", "rooms", "total_nights", "avg_nights"])
-    else:
-        nights_by_feature = (
-            feature_rows.groupby("Feature", dropna=False)
-            .agg(
-                rooms=("Room Number", "nunique"),
-                total_nights=("Number of Nights", "sum"),
-                avg_nights=("Number of Nights", "mean"),
-            )
-            .reset_index()
-            .sort_values(["total_nights", "rooms"], ascending=[False, False])
-        )
-        nights_by_feature["avg_nights"] = nights_by_feature["avg_nights"].round(2)
-    save_df(nights_by_feature, out_dir / "room_usage_by_feature.csv")
+    save_df(top_rooms, out_dir / "room_usage_top_rooms.csv", arrow)
 
-    usage_charts = []
-    if not nights_by_room_type.empty:
-        fig = plt.figure()
-        plt.barh(nights_by_room_type["Room Type"].map(safe_title), nights_by_room_type["total_nights"])
-        plt.title("Total nights by room type")
-        plt.xlabel("Total nights")
-        plt.ylabel("Room type")
-        plt.gca().invert_yaxis()
-        room_type_nights_path = out_dir / "room_usage_room_type_nights.png"
-        plot_and_save(fig, room_type_nights_path)
-        usage_charts.append({
-            "title": "",
-            "filename": room_type_nights_path.name,
-        })
+    # Canonical room index: features are split once into a rooms x features matrix,
+    # and housekeeping activity joins on the Room Number index.
+    catalog = build_room_catalog(usage_df, df)
+    nights_by_feature = catalog_nights_by_feature(catalog)
+    save_df(nights_by_feature, out_dir / "room_usage_by_feature.csv", arrow)
 
-    if not top_rooms.empty:
-        fig = plt.figure()
-        top_rooms_plot = top_rooms.head(top_n)
-        labels = top_rooms_plot.apply(
-            lambda row: f"{row['Room Number']} ({row['Room Type']})", axis=1
-        )
-        plt.barh(labels.map(safe_title), top_rooms_plot["Number of Nights"])
-        plt.title(f"Top {top_n} rooms by nights")
-        plt.xlabel("Number of nights")
-        plt.ylabel("Room")
-        plt.yticks(fontsize=6)
-        plt.gca().invert_yaxis()
-        top_rooms_path = out_dir / "room_usage_top_rooms.png"
-        plot_and_save(fig, top_rooms_path)
-        usage_charts.append({
-            "title": "",
-            "filename": top_rooms_path.name,
-        })
+    activity_by_room = room_activity(catalog, df)
+    feature_activity = changes_per_night_by_feature(catalog, activity_by_room)
+    save_df(feature_activity, out_dir / "room_feature_activity.csv", arrow)
 
-    if not nights_by_feature.empty:
-        fig = plt.figure()
-        feature_plot = nights_by_feature.head(top_n)
-        plt.barh(feature_plot["Feature"].map(safe_title), feature_plot["total_nights"])
-        plt.title(f"Top {top_n} features by nights")
-        plt.xlabel("Total nights")
-        plt.ylabel("Feature")
-        plt.gca().invert_yaxis()
-        feature_nights_path = out_dir / "room_usage_feature_nights.png"
-        plot_and_save(fig, feature_nights_path)
-        usage_charts.append({
-            "title": "",
-            "filename": feature_nights_path.name,
-        })
+    usage_charts = [] if args.summaries_only else room_usage_charts(
+        nights_by_room_type, top_rooms, nights_by_feature, out_dir, top_n
+    )
 
     usage_kpis = [
         {"label": "Total nights", "value": f"{total_nights:.0f}"},
@@ -631,10 +914,11 @@ def main():
         "by_room_type": nights_by_room_type,
         "top_rooms": top_rooms,
         "by_feature": nights_by_feature,
+        "feature_activity": feature_activity,
     }
 
     template_path = Path(__file__).resolve().parent / "Fixing up layout.html"
-    if template_path.exists():
+    if not args.summaries_only and template_path.exists():
         report_path = out_dir / "report.html"
         render_html_report(
             template_path,
@@ -644,13 +928,21 @@ def main():
             out_dir=out_dir,
             housekeeping=housekeeping_payload,
             room_usage=room_usage_payload,
+            comparison=comparison,
         )
         css_path = Path(__file__).resolve().parent / "Report.css"
         if css_path.exists():
             shutil.copy2(css_path, out_dir / css_path.name)
 
+    if arrow is not None:
+        arrow.write_manifest()
+
+    total_s = time.perf_counter() - _START
+
     # ---- Final message ----
     print(f"\n✅ Done. Report generated at:\n{out_dir.resolve()}\n")
+    mode = "summaries only" if args.summaries_only else "full report"
+    print(f"Timing ({mode}): first output after {first_output_s:.2f}s, finished in {total_s:.2f}s\n")
     print("Files created:")
     for p in sorted(out_dir.iterdir()):
         print(f" - {p.name}")
@@ -0,0 +1,156 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Housekeeping exports and the Room Usage report spell some room types differently.
+# Keys are compared case-insensitively; anything not listed is kept as-is.
+ROOM_TYPE_ALIASES = {
+    "classc": "Classic",
+    "classic": "Classic",
+    "deluxe": "Deluxe",
+    "suite": "Suite",
+}
+
+
+@dataclass
+class RoomCatalog:
+    """
+    Canonical per-room index built from Room Usage + the housekeeping change log.
+    `rooms` is indexed by Room Number and holds room_type and nights; row i of
+    feature_matrix (rooms x features, bool) marks which features rooms.iloc[i] has.
+    Feature text is free-form, so the number of columns isn't bounded.
+    """
+    rooms: pd.DataFrame
+    features: list[str]
+    feature_matrix: np.ndarray
+
+    def feature_column(self, feature: str) -> np.ndarray:
+        return self.feature_matrix[:, self.features.index(feature)]
+
+    def rooms_with(self, feature: str) -> pd.Index:
+        return self.rooms.index[self.feature_column(feature)]
+
+
+def normalize_room_type(series: pd.Series) -> pd.Series:
+    cleaned = series.fillna("").astype(str).str.strip()
+    return cleaned.str.casefold().map(ROOM_TYPE_ALIASES).fillna(cleaned)
+
+
+def split_features(series: pd.Series) -> pd.Series:
+    # One list of feature names per row, split once instead of on every rollup
+    return series.fillna("").astype(str).str.split(r"\s*,\s*").map(
+        lambda parts: [p.strip() for p in parts if p.strip()]
+    )
+
+
+def encode_features(feature_lists: pd.Series, features: list[str]) -> np.ndarray:
+    """One bool row per entry of feature_lists, one column per name in features."""
+    column = {name: i for i, name in enumerate(features)}
+    matrix = np.zeros((len(feature_lists), len(features)), dtype=bool)
+    rows = np.repeat(np.arange(len(feature_lists)), feature_lists.map(len).to_numpy())
+    cols = np.fromiter((column[f] for parts in feature_lists for f in parts), dtype=np.int64, count=len(rows))
+    matrix[rows, cols] = True
+    return matrix
+
+
+def build_room_catalog(usage_df: pd.DataFrame, housekeeping_df: pd.DataFrame | None = None) -> RoomCatalog:
+    """
+    Expects the normalized frames from room.py (string Room Number, numeric Number of Nights).
+    Rooms that only show up in the change log are kept with 0 nights and no features.
+    """
+    feature_lists = split_features(usage_df["Orientation/Features"])
+    features = sorted({f for parts in feature_lists for f in parts})
+    usage = pd.DataFrame({
+        "Room Number": usage_df["Room Number"].to_numpy(),
+        "room_type": normalize_room_type(usage_df["Room Type"]).to_numpy(),
+        "nights": usage_df["Number of Nights"].to_numpy(),
+    })
+    rooms = usage.groupby("Room Number", sort=False).agg(
+        room_type=("room_type", "first"),
+        nights=("nights", "sum"),
+    )
+    # A room listed on several usage rows has the union of their features
+    feature_frame = pd.DataFrame(encode_features(feature_lists, features), index=usage["Room Number"])
+    feature_matrix = feature_frame.groupby(level=0, sort=False).any().reindex(rooms.index).to_numpy(dtype=bool)
+
+    if housekeeping_df is not None and not housekeeping_df.empty:
+        hsk_types = (
+            housekeeping_df.assign(room_type=normalize_room_type(housekeeping_df["Room Type"]))
+            .groupby("Room Number", sort=False)["room_type"]
+            .agg(lambda s: s.mode().iat[0])
+        )
+        extra = hsk_types.index.difference(rooms.index)
+        if len(extra):
+            rooms = pd.concat([
+                rooms,
+                pd.DataFrame({"room_type": hsk_types.loc[extra], "nights": 0}, index=extra),
+            ])
+            feature_matrix = np.vstack([feature_matrix, np.zeros((len(extra), len(features)), dtype=bool)])
+
+    rooms.index.name = "Room Number"
+    return RoomCatalog(rooms=rooms, features=features, feature_matrix=feature_matrix)
+
+
+def room_activity(catalog: RoomCatalog, housekeeping_df: pd.DataFrame) -> pd.DataFrame:
+    """Per-room nights sold joined (on the Room Number index) with housekeeping activity."""
+    activity = housekeeping_df.groupby("Room Number", sort=False).agg(
+        hsk_rows=("Room Number", "size"),
+        hsk_changes=("HSK_Changed", "sum"),
+    )
+    joined = catalog.rooms.join(activity, how="left")
+    joined[["hsk_rows", "hsk_changes"]] = joined[["hsk_rows", "hsk_changes"]].fillna(0).astype(int)
+    return joined
+
+
+def nights_by_feature(catalog: RoomCatalog) -> pd.DataFrame:
+    columns = ["Feature", "rooms", "total_nights", "avg_nights"]
+    if not catalog.features:
+        return pd.DataFrame(columns=columns)
+    nights = catalog.rooms["nights"].to_numpy()
+    rows = []
+    for i, feature in enumerate(catalog.features):
+        hit = catalog.feature_matrix[:, i]
+        count = int(hit.sum())
+        total = nights[hit].sum()
+        rows.append({
+            "Feature": feature,
+            "rooms": count,
+            "total_nights": total,
+            "avg_nights": round(total / count, 2) if count else 0.0,
+        })
+    return (
+        pd.DataFrame(rows, columns=columns)
+        .sort_values(["total_nights", "rooms"], ascending=[False, False])
+        .reset_index(drop=True)
+    )
+
+
+def changes_per_night_by_feature(catalog: RoomCatalog, activity: pd.DataFrame) -> pd.DataFrame:
+    """Housekeeping changes per occupied night, rolled up by feature."""
+    columns = ["Feature", "rooms", "total_nights", "hsk_rows", "hsk_changes", "changes_per_night"]
+    if not catalog.features:
+        return pd.DataFrame(columns=columns)
+    # Rows line up with catalog.feature_matrix
+    activity = activity.reindex(catalog.rooms.index)
+    nights = activity["nights"].to_numpy()
+    hsk_rows = activity["hsk_rows"].to_numpy()
+    hsk_changes = activity["hsk_changes"].to_numpy()
+    rows = []
+    for i, feature in enumerate(catalog.features):
+        hit = catalog.feature_matrix[:, i]
+        total_nights = nights[hit].sum()
+        changes = int(hsk_changes[hit].sum())
+        rows.append({
+            "Feature": feature,
+            "rooms": int(hit.sum()),
+            "total_nights": total_nights,
+            "hsk_rows": int(hsk_rows[hit].sum()),
+            "hsk_changes": changes,
+            "changes_per_night": round(changes / total_nights, 4) if total_nights else 0.0,
+        })
+    return (
+        pd.DataFrame(rows, columns=columns)
+        .sort_values(["changes_per_night", "hsk_changes"], ascending=[False, False])
+        .reset_index(drop=True)
+    )
@@ -0,0 +1,179 @@
+import argparse
+import json
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+SNAPSHOT_VERSION = 1
+
+# Metrics stored per run; (key, label, is_rate)
+SNAPSHOT_KPIS = [
+    ("total_rows", "Total rows", False),
+    ("unique_rooms", "Unique rooms", False),
+    ("changed", "HSK changes", False),
+    ("change_rate", "Change rate", True),
+    ("avg_room_uniqueness_rate", "Avg room uniqueness", True),
+    ("avg_room_randomness", "Avg room randomness", True),
+]
+
+HK_COLUMNS = ["Housekeeper After", "rows", "changed", "change_rate"]
+USER_COLUMNS = ["Username", "total_actions", "status_changes", "room_uniqueness_rate", "room_randomness"]
+
+
+def period_label(day: date, kind: str = "week") -> str:
+    if kind == "week":
+        year, week, _ = day.isocalendar()
+        return f"{year}-W{week:02d}"
+    if kind == "month":
+        return f"{day.year}-{day.month:02d}"
+    raise ValueError(f"Unknown period kind: {kind} (expected week or month)")
+
+
+def period_bounds(label: str) -> tuple[date, date]:
+    """First and last day covered by a week (2026-W03) or month (2026-01) label."""
+    if "-W" in label:
+        year, week = label.split("-W")
+        monday = date.fromisocalendar(int(year), int(week), 1)
+        return monday, monday + timedelta(days=6)
+    try:
+        first = datetime.strptime(label, "%Y-%m").date()
+    except ValueError:
+        raise ValueError(f"{label!r} is not a week (2026-W03) or month (2026-01) label") from None
+    next_month = (first.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return first, next_month - timedelta(days=1)
+
+
+def previous_period(label: str) -> str:
+    """2026-W03 -> 2026-W02, 2026-01 -> 2025-12."""
+    try:
+        first, _ = period_bounds(label)
+    except ValueError:
+        raise ValueError(f"Can't work out the period before {label!r}; pass an explicit label instead") from None
+    return period_label(first - timedelta(days=1), "week" if "-W" in label else "month")
+
+
+def _table(df: pd.DataFrame, columns: list[str]) -> dict:
+    # Compact column/row layout; to_json takes care of numpy scalar types
+    return json.loads(df[columns].to_json(orient="split", index=False))
+
+
+def _frame(table: dict) -> pd.DataFrame:
+    return pd.DataFrame(table["data"], columns=table["columns"])
+
+
+def build_snapshot(
+    label: str,
+    *,
+    kpis: dict,
+    by_hk_after: pd.DataFrame,
+    uniqueness_by_user: pd.DataFrame,
+    source: str = "",
+) -> dict:
+    return {
+        "version": SNAPSHOT_VERSION,
+        "period": label,
+        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "source": source,
+        "kpis": {key: kpis[key] for key, _, _ in SNAPSHOT_KPIS},
+        "by_hk_after": _table(by_hk_after, HK_COLUMNS),
+        "by_user": _table(uniqueness_by_user, USER_COLUMNS),
+    }
+
+
+def save_snapshot(store_dir: Path, snapshot: dict) -> Path:
+    store_dir.mkdir(parents=True, exist_ok=True)
+    path = store_dir / f"{snapshot['period']}.json"
+    path.write_text(json.dumps(snapshot, separators=(",", ":")), encoding="utf-8")
+    return path
+
+
+def stored_rows(store_dir: Path, label: str) -> int | None:
+    """total_rows of the snapshot already stored for a period, or None."""
+    path = store_dir / f"{label}.json"
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))["kpis"].get("total_rows")
+
+
+def load_snapshot(store_dir: Path, label: str) -> dict:
+    path = store_dir / f"{label}.json"
+    if not path.exists():
+        raise FileNotFoundError(f"No snapshot for period {label} in {store_dir}")
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _delta_table(current: pd.DataFrame, baseline: pd.DataFrame, key: str, metrics: list[str]) -> pd.DataFrame:
+    merged = current.merge(baseline, on=key, how="outer", suffixes=("", "_prev"))
+    for col in metrics:
+        # The outer merge turns counts into floats (NaN for missing keys); cast them back
+        is_count = pd.api.types.is_integer_dtype(current[col]) and pd.api.types.is_integer_dtype(baseline[col])
+        for name in (col, f"{col}_prev"):
+            merged[name] = merged[name].fillna(0)
+            if is_count:
+                merged[name] = merged[name].astype("int64")
+        merged[f"{col}_delta"] = merged[col] - merged[f"{col}_prev"]
+        if not is_count:
+            merged[f"{col}_delta"] = merged[f"{col}_delta"].round(4)
+    ordered = [key] + [c for col in metrics for c in (col, f"{col}_delta")]
+    return merged[ordered].sort_values(metrics[0], ascending=False).reset_index(drop=True)
+
+
+def compare_snapshots(current: dict, baseline: dict) -> dict:
+    kpis = []
+    for key, label, is_rate in SNAPSHOT_KPIS:
+        now = current["kpis"].get(key) or 0
+        prev = baseline["kpis"].get(key) or 0
+        kpis.append({
+            "metric": label,
+            "current": now,
+            "baseline": prev,
+            "delta": round(now - prev, 4),
+            "is_rate": is_rate,
+        })
+    return {
+        "period": current["period"],
+        "baseline_period": baseline["period"],
+        "kpis": kpis,
+        "by_hk_after": _delta_table(
+            _frame(current["by_hk_after"]),
+            _frame(baseline["by_hk_after"]),
+            "Housekeeper After",
+            ["changed", "rows", "change_rate"],
+        ),
+        "by_user": _delta_table(
+            _frame(current["by_user"]),
+            _frame(baseline["by_user"]),
+            "Username",
+            ["total_actions", "status_changes", "room_uniqueness_rate", "room_randomness"],
+        ),
+    }
+
+
+def write_comparison(comparison: dict, out_dir: Path):
+    # object dtype keeps counts as ints next to the rate rows
+    pd.DataFrame(comparison["kpis"], dtype=object).drop(columns=["is_rate"]).to_csv(out_dir / "compare_kpis.csv", index=False)
+    comparison["by_hk_after"].to_csv(out_dir / "compare_by_housekeeper_after.csv", index=False)
+    comparison["by_user"].to_csv(out_dir / "compare_by_username.csv", index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two stored report snapshots without re-reading the CSVs.")
+    parser.add_argument("period", help="Current period label (e.g. 2026-W03 or 2026-01)")
+    parser.add_argument("baseline", nargs="?", default="previous",
+                        help="Baseline period label, or 'previous' (default)")
+    parser.add_argument("--snapshot-dir", default="snapshots", help="Snapshot store (default: snapshots)")
+    parser.add_argument("--out", default=".", help="Where to write compare_*.csv (default: current folder)")
+    args = parser.parse_args()
+
+    store = Path(args.snapshot_dir)
+    baseline = previous_period(args.period) if args.baseline == "previous" else args.baseline
+    comparison = compare_snapshots(load_snapshot(store, args.period), load_snapshot(store, baseline))
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    write_comparison(comparison, out_dir)
+    print(f"Compared {args.period} against {baseline}; wrote compare_*.csv to {out_dir.resolve()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import datetime as dt
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import requests
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:147.0) Gecko/20100101 Firefox/147.0",
+    "Accept": "text/csv,*/*",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+
+def export_headers(url: str, cookie: str = "") -> dict:
+    origin = urlsplit(url)
+    headers = dict(DEFAULT_HEADERS)
+    headers["Referer"] = f"{origin.scheme}://{origin.netloc}/"
+    if cookie:
+        headers["Cookie"] = cookie
+    return headers
+
+
+def looks_like_html(payload: bytes) -> bool:
+    # If you got HTML, you're not authenticated or instanceID expired
+    sample = payload[:500].decode("utf-8", errors="replace").lower()
+    return "<html" in sample or "<!doctype" in sample
+
+
+def fetch_export(url: str, headers: dict, timeout: float = 60, session: requests.Session | None = None) -> requests.Response:
+    getter = session.get if session is not None else requests.get
+    return getter(url, headers=headers, timeout=timeout, allow_redirects=True)
+
+
+def save_export(url: str, headers: dict, out_dir: Path = Path("exports"), prefix: str = "telerik_export") -> Path | None:
+    """Download one export into out_dir. Returns the CSV path, or None if the server sent HTML."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    ts = dt.datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    r = fetch_export(url, headers)
+    print("[*] Status:", r.status_code)
+    print("[*] Content-Type:", r.headers.get("Content-Type"))
+
+    if looks_like_html(r.content):
+        print("[!] Got HTML instead of CSV. Likely logged out or instanceID invalid.")
+        # Save it anyway for inspection
+        html_path = out_dir / f"{prefix}_{ts}.html"
+        html_path.write_text(r.text, encoding="utf-8", errors="replace")
+        print("[*] Saved HTML to:", html_path)
+        return None
+
+    out_path = out_dir / f"{prefix}_{ts}.csv"
+    out_path.write_bytes(r.content)
+    print("[+] Saved CSV to:", out_path, f"({len(r.content):,} bytes)")
+    return out_path
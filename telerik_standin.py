@@ -0,0 +1,129 @@
+import argparse
+import csv
+import io
+import random
+import re
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# Requests for this instanceID get the HTML login page, like an expired session
+LOGGED_OUT_INSTANCE = "0" * 32
+
+INSTANCE_RE = re.compile(r"^[0-9a-f]{32}$", re.I)
+
+LOGGED_OUT_HTML = b"""<!DOCTYPE html>
+<html><head><title>Login</title></head>
+<body><form action="Login.aspx" method="post">
+<input name="username"><input name="password" type="password">
+</form></body></html>
+"""
+
+ROOM_TYPES = ["Classc", "Classc", "Classc", "Deluxe", "Suite"]
+FD_STATUSES = ["Occupied", "Vacant", "Out Of Order"]
+HSK_STATUSES = ["Clean/Vacant", "Clean/Occupied", "Dirty", "inspect"]
+HOUSEKEEPERS = ["", "Dixie C.", "Jesse R.", "Felicity A.", "Emery R.", "Sam T."]
+USERNAMES = ["MasonR", "CyndiC", "ChorumPMS", "Administrator", "CarterJ", "DixieC", "NachelleW"]
+
+
+def synthetic_change_log(rows: int, seed: int = 7, end_ts: int = 1768434335) -> bytes:
+    """A Housekeeping Change Log CSV shaped like the real export, newest row first."""
+    rng = random.Random(seed)
+    rooms = [f"{floor}{num:02d}" for floor in range(2, 6) for num in range(1, 26)]
+    room_types = {room: rng.choice(ROOM_TYPES) for room in rooms}
+
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow([
+        "Room Number", "Room Type", "FD Status", "HSK Status Before", "HSK Status After",
+        "Housekeeper Before", "Housekeeper After", "Username", "Date",
+    ])
+    ts = end_ts
+    for _ in range(rows):
+        room = rng.choice(rooms)
+        before = rng.choice(HSK_STATUSES)
+        after = before if rng.random() < 0.4 else rng.choice(HSK_STATUSES)
+        writer.writerow([
+            room,
+            room_types[room],
+            rng.choice(FD_STATUSES),
+            before,
+            after,
+            rng.choice(HOUSEKEEPERS),
+            rng.choice(HOUSEKEEPERS),
+            rng.choice(USERNAMES),
+            ts,
+        ])
+        ts -= rng.randint(30, 3600)
+    return buf.getvalue().encode("utf-8")
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    server: "TelerikStandin"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path.lower() != "/telerik.reportviewer.axd":
+            self.send_error(404)
+            return
+        query = parse_qs(url.query)
+        instance = query.get("instanceID", [""])[0]
+        if query.get("optype", [""])[0] != "Export":
+            self.send_error(400, "Only optype=Export is served")
+            return
+
+        if self.server.latency_s:
+            time.sleep(self.server.latency_s)
+
+        if instance == LOGGED_OUT_INSTANCE or not INSTANCE_RE.match(instance):
+            self._send(LOGGED_OUT_HTML, "text/html; charset=utf-8")
+        else:
+            self._send(self.server.payload, "text/csv")
+
+    def _send(self, body: bytes, content_type: str):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TelerikStandin(ThreadingHTTPServer):
+    """Local Telerik.ReportViewer.axd export endpoint serving a synthetic change log."""
+
+    daemon_threads = True
+
+    def __init__(self, *, rows: int = 10_000, latency_ms: float = 0, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), StandinHandler)
+        self.payload = synthetic_change_log(rows)
+        self.latency_s = latency_ms / 1000
+
+    def export_url(self, instance_id: str = "a" * 32) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/Telerik.ReportViewer.axd?instanceID={instance_id}&optype=Export&ExportFormat=CSV"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve synthetic Telerik CSV exports locally.")
+    parser.add_argument("--rows", type=int, default=10_000, help="Rows per export (default: 10000)")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Delay before each response (default: 0)")
+    parser.add_argument("--port", type=int, default=8765, help="Port, 0 for any free port (default: 8765)")
+    args = parser.parse_args()
+
+    server = TelerikStandin(rows=args.rows, latency_ms=args.latency_ms, port=args.port)
+    # First line is read by bench_ingest.py to find the port (--port 0 picks a free one)
+    print(f"Serving {len(server.payload):,} byte exports at {server.export_url()}", flush=True)
+    print(f"Logged-out response: {server.export_url(LOGGED_OUT_INSTANCE)}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import json
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from anomaly import update_anomalies
+
+
+def _log():
+    # One change an hour for "amy", then a burst of 6 changes all stamped the same second
+    rows = [(pd.Timestamp("2026-01-01 00:10") + pd.Timedelta(hours=h), f"1{h:02d}") for h in range(10)]
+    burst = pd.Timestamp("2026-01-01 10:20:05")
+    rows += [(burst, f"2{n:02d}") for n in range(6)]
+    rows.append((pd.Timestamp("2026-01-01 12:00"), "300"))
+    return pd.DataFrame({
+        "DateTime": [when for when, _ in rows],
+        "HSK_Changed": True,
+        "Username": "amy",
+        "Housekeeper After": "Dixie C.",
+        "Room Number": [room for _, room in rows],
+    }), burst
+
+
+def test_split_same_second_group(tmp_path):
+    df, burst = _log()
+    update_anomalies(df, tmp_path / "one.json", tmp_path / "one.csv", min_history=5)
+
+    # First export ends after the first row of the burst; the next one repeats the whole log
+    cut = df.index[df["DateTime"] == burst][0] + 1
+    update_anomalies(df.iloc[:cut], tmp_path / "split.json", tmp_path / "split.csv", min_history=5)
+    update_anomalies(df, tmp_path / "split.json", tmp_path / "split.csv", min_history=5)
+
+    one = pd.read_csv(tmp_path / "one.csv")
+    split = pd.read_csv(tmp_path / "split.csv")
+    assert one.loc[one["entity"] == "Username", "changes"].tolist() == [6]
+    pd.testing.assert_frame_equal(
+        one.sort_values(["entity", "key"]).reset_index(drop=True),
+        split.sort_values(["entity", "key"]).reset_index(drop=True),
+    )
+    one_state = json.loads((tmp_path / "one.json").read_text())
+    split_state = json.loads((tmp_path / "split.json").read_text())
+    assert one_state["keys"] == split_state["keys"]
+
+    # Re-ingesting the same export adds nothing
+    assert update_anomalies(df, tmp_path / "split.json", tmp_path / "split.csv", min_history=5).empty
+    assert json.loads((tmp_path / "split.json").read_text()) == split_state
@@ -0,0 +1,40 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from user_room_matrix import build_user_room_matrix
+
+
+def _log(rows):
+    return pd.DataFrame(rows, columns=["Username", "Room Number"])
+
+
+def test_empty_log():
+    matrix = build_user_room_matrix(_log([]))
+    assert matrix.rotation_metrics().empty
+    assert matrix.room_concentration().empty
+    assert matrix.user_similarity().empty
+
+
+def test_rotation_and_similarity():
+    matrix = build_user_room_matrix(_log([
+        ("amy", "101"), ("amy", "101"), ("amy", "102"),
+        ("bob", "101"), ("bob", "103"),
+        ("cal", "104"),
+    ]))
+    rotation = matrix.rotation_metrics().set_index("Username")
+    assert rotation.loc["amy", "total_actions"] == 3
+    assert rotation.loc["amy", "unique_rooms"] == 2
+    assert abs(rotation.loc["amy", "room_randomness"] - (1 - (4 / 9 + 1 / 9))) < 1e-9
+    assert rotation.loc["cal", "room_randomness"] == 0.0
+
+    similarity = matrix.user_similarity()
+    assert similarity[["user_a", "user_b", "shared_rooms"]].values.tolist() == [["amy", "bob", 1]]
+    assert similarity.loc[0, "jaccard"] == round(1 / 3, 3)
+
+    concentration = matrix.room_concentration().set_index("Room Number")
+    assert concentration.loc["101", "users"] == 2
+    assert concentration.loc["101", "top_user"] == "amy"
@@ -0,0 +1,133 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class UserRoomMatrix:
+    """
+    Sparse user x room action counts in CSR layout (SciPy-style indptr/indices/data).
+    Row i holds users[i]; indices point into rooms.
+    """
+    users: np.ndarray
+    rooms: np.ndarray
+    indptr: np.ndarray
+    indices: np.ndarray
+    data: np.ndarray
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return len(self.users), len(self.rooms)
+
+    def row_ids(self) -> np.ndarray:
+        return np.repeat(np.arange(len(self.users)), np.diff(self.indptr))
+
+    def row_totals(self) -> np.ndarray:
+        return np.bincount(self.row_ids(), weights=self.data, minlength=len(self.users))
+
+    def row_nnz(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def rotation_metrics(self) -> pd.DataFrame:
+        """Per-user total_actions, unique_rooms, room_randomness (1 - HHI) and room_uniqueness_rate."""
+        rows = self.row_ids()
+        totals = self.row_totals()
+        shares = self.data / totals[rows]
+        hhi = np.bincount(rows, weights=shares ** 2, minlength=len(self.users))
+        nnz = self.row_nnz()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            uniqueness = np.where(totals > 0, nnz / totals, 0.0)
+        return pd.DataFrame({
+            "Username": self.users,
+            "total_actions": totals.astype(np.int64),
+            "unique_rooms": nnz,
+            "room_randomness": np.where(totals > 0, 1 - hhi, 0.0),
+            "room_uniqueness_rate": uniqueness,
+        })
+
+    def user_similarity(self) -> pd.DataFrame:
+        """Room-overlap (Jaccard) similarity for every pair of users sharing at least one room."""
+        n_users = len(self.users)
+        # Walk the matrix column-wise (CSC order); each room contributes only its own user pairs
+        order = np.argsort(self.indices, kind="stable")
+        rows = self.row_ids()[order]
+        bounds = np.flatnonzero(np.diff(self.indices[order])) + 1
+        pair_keys = []
+        for users in np.split(rows, bounds):
+            if len(users) > 1:
+                i, j = np.triu_indices(len(users), k=1)
+                pair_keys.append(users[i] * n_users + users[j])
+
+        if not pair_keys:
+            return pd.DataFrame(columns=["user_a", "user_b", "shared_rooms", "rooms_a", "rooms_b", "jaccard"])
+
+        # Same trick as build_user_room_matrix: unique flattened (a, b) keys + their counts
+        keys, shared = np.unique(np.concatenate(pair_keys), return_counts=True)
+        a, b = keys // n_users, keys % n_users
+        nnz = self.row_nnz()
+        union = nnz[a] + nnz[b] - shared
+        return (
+            pd.DataFrame({
+                "user_a": self.users[a],
+                "user_b": self.users[b],
+                "shared_rooms": shared,
+                "rooms_a": nnz[a],
+                "rooms_b": nnz[b],
+                "jaccard": np.round(shared / union, 3),
+            })
+            .sort_values(["jaccard", "shared_rooms"], ascending=[False, False])
+            .reset_index(drop=True)
+        )
+
+    def room_concentration(self) -> pd.DataFrame:
+        """Per room: how many users touch it and how concentrated its actions are."""
+        columns = ["Room Number", "users", "total_actions", "top_user", "top_user_share", "user_hhi"]
+        if len(self.data) == 0:
+            return pd.DataFrame(columns=columns)
+        n_rooms = len(self.rooms)
+        cols = self.indices
+        users = np.bincount(cols, minlength=n_rooms)
+        totals = np.bincount(cols, weights=self.data, minlength=n_rooms)
+        shares = self.data / totals[cols]
+        hhi = np.bincount(cols, weights=shares ** 2, minlength=n_rooms)
+
+        # Heaviest user per room: sort by (room, -count) and take the first entry of each room
+        order = np.lexsort((-self.data, cols))
+        first = order[np.r_[0, np.flatnonzero(np.diff(cols[order])) + 1]]
+        top_user = np.empty(n_rooms, dtype=object)
+        top_share = np.zeros(n_rooms)
+        top_user[cols[first]] = self.users[self.row_ids()[first]]
+        top_share[cols[first]] = shares[first]
+
+        return (
+            pd.DataFrame({
+                "Room Number": self.rooms,
+                "users": users,
+                "total_actions": totals.astype(np.int64),
+                "top_user": top_user,
+                "top_user_share": np.round(top_share, 3),
+                "user_hhi": np.round(hhi, 3),
+            })
+            .sort_values(["users", "total_actions"], ascending=[False, False])
+            .reset_index(drop=True)
+        )
+
+
+def build_user_room_matrix(df: pd.DataFrame, user_col: str = "Username", room_col: str = "Room Number") -> UserRoomMatrix:
+    user_codes, users = pd.factorize(df[user_col], sort=True)
+    room_codes, rooms = pd.factorize(df[room_col], sort=True)
+    n_users, n_rooms = len(users), len(rooms)
+
+    # Sorting the flattened (user, room) keys yields CSR order directly
+    keys, counts = np.unique(user_codes.astype(np.int64) * n_rooms + room_codes, return_counts=True)
+    row = keys // n_rooms if n_rooms else keys
+    indptr = np.zeros(n_users + 1, dtype=np.int64)
+    np.cumsum(np.bincount(row, minlength=n_users), out=indptr[1:])
+    return UserRoomMatrix(
+        users=np.asarray(users, dtype=object),
+        rooms=np.asarray(rooms, dtype=object),
+        indptr=indptr,
+        indices=keys % n_rooms if n_rooms else keys,
+        data=counts.astype(np.int64),
+    )